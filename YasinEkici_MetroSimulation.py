@@ -1,30 +1,323 @@
-import tkinter as tk
-from tkinter import ttk
-import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from array import array
 from collections import defaultdict, deque
 import heapq
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 import itertools
 import math
-import matplotlib.patches as mpatches
+import os
+import time
+
+# GUI / plotting modules, imported on demand by _load_gui_modules() so the routing core
+# (Station, MetroNetwork, collapse_route) works on headless machines and imports fast.
+tk = ttk = Figure = FigureCanvasTkAgg = mpatches = None
+
+
+def _load_gui_modules() -> None: #Imports tkinter and matplotlib the first time the GUI is needed.
+    global tk, ttk, Figure, FigureCanvasTkAgg, mpatches
+    if tk is not None:
+        return
+    import tkinter
+    from tkinter import ttk as tkinter_ttk
+    from matplotlib.figure import Figure as MplFigure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as MplCanvas
+    import matplotlib.patches as mpl_patches
+
+    tk, ttk = tkinter, tkinter_ttk
+    Figure, FigureCanvasTkAgg, mpatches = MplFigure, MplCanvas, mpl_patches
 
 # 1) Station and metro network classes
 
-class Station: #Represents a single station with an ID, name, line, coordinates, and a list of neighboring stations (with travel times).
-    
-    def __init__(self, idx: str, name: str, line: str, x: float = 0.0, y: float = 0.0):
-        self.idx = idx
-        self.name = name
-        self.line = line
-        self.x = x
-        self.y = y
-        self.neighbors: List[Tuple['Station', int]] = []  # (station, travel_time)
+class Station:
+    #Represents a single station with an ID, name, line, coordinates, and a list of neighboring stations (with travel times).
+    #A Station is a slots-only view onto the MetroNetwork that owns it: names and lines are stored as
+    #integer ids into shared string tables, coordinates and neighbors live in the network's flat arrays.
+    #Stations are created by MetroNetwork.add_station(), not constructed directly.
+
+    __slots__ = ('_network', '_index')
+
+    def __init__(self, network: 'MetroNetwork', index: int):
+        self._network = network
+        self._index = index
+
+    @property
+    def idx(self) -> str:
+        return self._network._idx[self._index]
+
+    @idx.setter
+    def idx(self, value: str) -> None:
+        self._network._idx[self._index] = value
+
+    @property
+    def name(self) -> str:
+        return self._network._names[self._network._station_name[self._index]]
+
+    @name.setter
+    def name(self, value: str) -> None:
+        network = self._network
+        network._station_name[self._index] = _intern(value, network._names, network._name_ids)
+        network._state_graph = None
+
+    @property
+    def line(self) -> str:
+        return self._network._line_names[self._network._station_line[self._index]]
+
+    @line.setter
+    def line(self, value: str) -> None:
+        network = self._network
+        network._station_line[self._index] = _intern(value, network._line_names, network._line_ids)
+        network._state_graph = None
+
+    @property
+    def x(self) -> float:
+        return self._network._xs[self._index]
+
+    @x.setter
+    def x(self, value: float) -> None:
+        self._network._xs[self._index] = value
+        self._network._state_graph = None
+
+    @property
+    def y(self) -> float:
+        return self._network._ys[self._index]
+
+    @y.setter
+    def y(self, value: float) -> None:
+        self._network._ys[self._index] = value
+        self._network._state_graph = None
+
+    @property
+    def neighbors(self) -> '_NeighborList': #(station, travel_time) pairs, read from the shared edge arrays.
+        network = self._network
+        stations = network._station_objects
+        return _NeighborList(self, [(stations[target], travel_time) for target, travel_time in network._edges_from(self._index)])
 
     def add_neighbor(self, station: 'Station', travel_time: int):# Adds a neighbor station along with travel time to get there.
-        
-        self.neighbors.append((station, travel_time))
+
+        self._network._add_edge(self._index, station._index, travel_time)
+
+
+class _NeighborList(list):
+    #Snapshot of a station's neighbors. append()/extend() add edges to the network like add_neighbor();
+    #other edits would only change the snapshot, so they raise instead of being silently lost.
+
+    def __init__(self, station: Station, pairs: List[Tuple[Station, int]]):
+        super().__init__(pairs)
+        self._station = station
+
+    def append(self, pair: Tuple[Station, int]) -> None:
+        station, travel_time = pair
+        self._station.add_neighbor(station, travel_time)
+        super().append((station, travel_time))
+
+    def extend(self, pairs) -> None:
+        for pair in pairs:
+            self.append(pair)
+
+    def __iadd__(self, pairs):
+        self.extend(pairs)
+        return self
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Station.neighbors only supports append/extend; connections cannot be removed or edited")
+
+    __setitem__ = __delitem__ = __imul__ = insert = remove = pop = clear = sort = reverse = _read_only
+
+
+def _intern(value: str, table: List[str], ids: Dict[str, int]) -> int: #Returns the id of value in a string table, adding it on first use.
+    value_id = ids.get(value)
+    if value_id is None:
+        value_id = ids[value] = len(table)
+        table.append(value)
+    return value_id
+
+
+def _penalties(transfer_penalty: float, walk_penalty: float) -> Tuple[float, float, float]: #Search cost added per edge kind; negative values would break Dijkstra / A*.
+    if transfer_penalty < 0 or walk_penalty < 0:
+        raise ValueError(f"penalties must be >= 0, got transfer_penalty={transfer_penalty}, walk_penalty={walk_penalty}")
+    return (0, transfer_penalty, walk_penalty)
+
+
+def _check_max_transfers(max_transfers: Optional[int]) -> None:
+    if max_transfers is not None and max_transfers < 0:
+        raise ValueError(f"max_transfers must be None or >= 0, got {max_transfers}")
+
+
+# Edge kinds of the line-expanded state graph
+RIDE = 0      # next station on the same line
+TRANSFER = 1  # line change inside the same station (same name, different line)
+WALK = 2      # line change between differently named stations
+
+
+class StateGraph:
+    #Line-expanded (station x line) graph compiled from a MetroNetwork.
+    #Every Station already lives on exactly one line, so each station is one state, numbered like the network.
+    #Edges are stored in flat arrays, grouped by source state (compressed sparse rows): the edges leaving
+    #state u are ids offsets[u] .. offsets[u + 1] - 1 with targets[e], times[e] and kinds[e], so the
+    #searches never touch Station objects. Names, ids and coordinates are read from the network's own arrays.
+
+    def __init__(self, metro: 'MetroNetwork'):
+        self.stations: List[Station] = metro._station_objects
+        self.names: List[str] = metro._names
+        self.line_names: List[str] = metro._line_names
+        self.name_ids: array = metro._station_name
+        self.line_ids: array = metro._station_line
+        self.xs: array = metro._xs
+        self.ys: array = metro._ys
+
+        name_ids, line_ids = self.name_ids, self.line_ids
+        first_edge, edge_next, edge_target, edge_time = metro._first_edge, metro._edge_next, metro._edge_target, metro._edge_time
+        n = len(self.stations)
+        self.offsets = array('l', [0]) * (n + 1)
+        self.targets = array('l')
+        self.kinds = array('b')
+        times = array('d')
+        for s in range(n):
+            edge = first_edge[s]
+            while edge != -1:
+                t = edge_target[edge]
+                self.targets.append(t)
+                times.append(edge_time[edge])
+                if line_ids[s] == line_ids[t]:
+                    self.kinds.append(RIDE)
+                elif name_ids[s] == name_ids[t]:
+                    self.kinds.append(TRANSFER)
+                else:
+                    self.kinds.append(WALK)
+                edge = edge_next[edge]
+            self.offsets[s + 1] = len(self.targets)
+        # Whole-number travel times stay integers, so route times read like the input
+        self.times: array = array('l', map(int, times)) if all(t.is_integer() for t in times) else times
+        self._reverse: Optional[Tuple[array, array, array, array]] = None
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def arrays(self) -> Tuple[array, array, array, array]: #(offsets, targets, times, kinds), the form the analytics kernels take.
+        return self.offsets, self.targets, self.times, self.kinds
+
+    def edges(self, state: int) -> List[Tuple[int, int, int]]: #(target, travel_time, kind) of the edges leaving state.
+        a, b = self.offsets[state], self.offsets[state + 1]
+        return list(zip(self.targets[a:b], self.times[a:b], self.kinds[a:b]))
+
+    def edge_list(self) -> List[Tuple[int, int]]: #(source, target) of every directed connection in edge-id order: the numbering of the analytics arrays.
+        offsets, targets = self.offsets, self.targets
+        return [(s, targets[e]) for s in range(len(self)) for e in range(offsets[s], offsets[s + 1])]
+
+    def reverse_arrays(self) -> Tuple[array, array, array, array]: #Incoming edges as (offsets, sources, times, kinds) rows per target, built on first use.
+        if self._reverse is None:
+            n = len(self)
+            offsets, targets, times, kinds = self.arrays
+            reverse_offsets = array('l', [0]) * (n + 1)
+            for t in targets:
+                reverse_offsets[t + 1] += 1
+            for s in range(n):
+                reverse_offsets[s + 1] += reverse_offsets[s]
+            fill = array('l', reverse_offsets)
+            sources = array('l', [0]) * len(targets)
+            reverse_times = array(times.typecode, [0]) * len(targets)
+            reverse_kinds = array('b', [0]) * len(targets)
+            for s in range(n):
+                for e in range(offsets[s], offsets[s + 1]):
+                    t = targets[e]
+                    slot = fill[t]
+                    fill[t] = slot + 1
+                    sources[slot] = s
+                    reverse_times[slot] = times[e]
+                    reverse_kinds[slot] = kinds[e]
+            self._reverse = (reverse_offsets, sources, reverse_times, reverse_kinds)
+        return self._reverse
+
+    def shortest_path_tree(self, root: int, penalties: Tuple[float, float, float] = (0, 0, 0),
+                           reverse: bool = False) -> Tuple[List[float], List[int]]:
+        #Plain Dijkstra from root over the whole graph; edge cost = travel_time + penalties[kind].
+        #Returns (dist, pred) lists indexed by state, with inf / -1 for unreachable states.
+        #With reverse=True distances are measured *to* root and pred[s] is the next state after s on the way there.
+        offsets, targets, times, kinds = self.reverse_arrays() if reverse else self.arrays
+        n = len(self)
+        dist = [math.inf] * n
+        pred = [-1] * n
+        dist[root] = 0
+        pq = [(0, root)]
+        pop, push = heapq.heappop, heapq.heappush
+
+        while pq:
+            d, u = pop(pq)
+            if d > dist[u]:
+                continue
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                nd = d + times[e] + penalties[kinds[e]]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    push(pq, (nd, v))
+        return dist, pred
+
+    def route(self, parent: Dict[int, Optional[int]], state: int, width: int = 1) -> List[Station]:
+        #Walks the predecessor map back from state and returns the Station route.
+        #States are encoded as node * width + transfers, so width = 1 means plain station indices.
+        route = []
+        while state is not None:
+            route.append(self.stations[state // width])
+            state = parent[state]
+        route.reverse()
+        return route
+
+
+class SearchStats:
+    #Per-query counters of a route search. Filled in when passed as stats=... or when the network has search sinks.
+    #settled: states expanded, pushes: queue insertions, relaxations: edges scanned from settled states,
+    #heap_max: queue size high-water mark, elapsed: wall time in seconds.
+
+    __slots__ = ('algorithm', 'start_id', 'end_id', 'found',
+                 'settled', 'pushes', 'relaxations', 'heap_max', 'elapsed')
+
+    def __init__(self):
+        self.algorithm = ""
+        self.start_id = ""
+        self.end_id = ""
+        self.found = False
+        self.settled = 0
+        self.pushes = 0
+        self.relaxations = 0
+        self.heap_max = 0
+        self.elapsed = 0.0
+
+
+class _CountingRange:
+    #Stands in for range() over a state's edge ids while a search is instrumented and counts the edges scanned.
+    #Uninstrumented searches call the builtin, so the hot loop pays nothing for this.
+
+    __slots__ = ('scanned',)
+
+    def __init__(self):
+        self.scanned = 0
+
+    def __call__(self, first: int, last: int) -> range:
+        self.scanned += last - first
+        return range(first, last)
+
+
+class SearchHistogram:
+    #Search sink that aggregates SearchStats into power-of-two bucket histograms per algorithm.
+    #Bucket k counts the queries whose value v satisfies 2**(k-1) <= v < 2**k (bucket 0 holds v == 0).
+
+    FIELDS = ('settled', 'relaxations', 'heap_max', 'elapsed_us')
+
+    def __init__(self):
+        self.queries: Dict[str, int] = defaultdict(int)
+        self.buckets: Dict[Tuple[str, str], Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def __call__(self, stats: SearchStats) -> None:
+        self.queries[stats.algorithm] += 1
+        values = (stats.settled, stats.relaxations, stats.heap_max, int(stats.elapsed * 1e6))
+        for field, value in zip(self.FIELDS, values):
+            self.buckets[(stats.algorithm, field)][int(value).bit_length()] += 1
+
+    def histogram(self, algorithm: str, field: str) -> List[Tuple[int, int, int]]: #Returns (low, high, count) rows, low <= value < high.
+        buckets = self.buckets.get((algorithm, field), {})
+        return [((1 << (k - 1)) if k else 0, 1 << k, buckets[k]) for k in sorted(buckets)]
 
 
 class MetroNetwork:#Holds all stations and lines. Allows adding stations, connections, and searching for routes with different algorithms.
@@ -32,13 +325,53 @@ class MetroNetwork:#Holds all stations and lines. Allows adding stations, connec
     def __init__(self):
         self.stations: Dict[str, Station] = {}
         self.lines: Dict[str, List[Station]] = defaultdict(list)
+        self._state_graph: Optional[StateGraph] = None  # compiled lazily by state_graph()
+        self._search_sinks: List[Callable[[SearchStats], None]] = []
+        self.search_histograms: Optional[SearchHistogram] = None
+
+        # String tables: every distinct station name / line name is stored once and referenced by id
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._line_names: List[str] = []
+        self._line_ids: Dict[str, int] = {}
+
+        # Per-station arrays, indexed by Station._index
+        self._idx: List[str] = []
+        self._station_objects: List[Station] = []
+        self._station_name = array('l')
+        self._station_line = array('l')
+        self._xs = array('d')
+        self._ys = array('d')
+        self._first_edge = array('l')  # first outgoing edge id, -1 if none
+        self._last_edge = array('l')   # last outgoing edge id, for appending in insertion order
+
+        # Per-edge arrays (directed, forward-star linked lists per station)
+        self._edge_target = array('l')
+        self._edge_time = array('d')    # float so fractional travel times work; whole numbers read back as int
+        self._edge_next = array('l')
 
     def add_station(self, idx: str, name: str, line: str, x: float = 0.0, y: float = 0.0) -> None: #Creates and stores a new Station object if it doesn't already exist.
         
         if idx not in self.stations:
-            station = Station(idx, name, line, x, y)
+            # Convert first so a bad value cannot leave the per-station arrays with different lengths
+            x, y = float(x), float(y)
+            name_id = _intern(name, self._names, self._name_ids)
+            line_id = _intern(line, self._line_names, self._line_ids)
+
+            index = len(self._idx)
+            self._idx.append(idx)
+            self._station_name.append(name_id)
+            self._station_line.append(line_id)
+            self._xs.append(x)
+            self._ys.append(y)
+            self._first_edge.append(-1)
+            self._last_edge.append(-1)
+
+            station = Station(self, index)
+            self._station_objects.append(station)
             self.stations[idx] = station
             self.lines[line].append(station)
+            self._state_graph = None
 
     def add_connection(self, station1_id: str, station2_id: str, travel_time: int) -> None: #Creates a bidirectional connection between two stations with a given travel time.
     
@@ -47,75 +380,773 @@ class MetroNetwork:#Holds all stations and lines. Allows adding stations, connec
         station1.add_neighbor(station2, travel_time)
         station2.add_neighbor(station1, travel_time)
 
-    def find_min_transfers_route(self, start_id: str, end_id: str) -> Optional[List[Station]]:
-        #Uses a 0-1 BFS approach to find a route with the minimum number of line transfers.
-        #Cost = 0 if the next station is on the same line, otherwise cost = 1.
-        
+    def _add_edge(self, source: int, target: int, travel_time: int) -> None: #Appends the directed edge source -> target to the shared edge arrays.
+
+        # Convert first so a bad value cannot leave the per-edge arrays with different lengths
+        travel_time = float(travel_time)
+        edge = len(self._edge_target)
+        self._edge_target.append(target)
+        self._edge_time.append(travel_time)
+        self._edge_next.append(-1)
+        if self._last_edge[source] == -1:
+            self._first_edge[source] = edge
+        else:
+            self._edge_next[self._last_edge[source]] = edge
+        self._last_edge[source] = edge
+        self._state_graph = None
+
+    def _edges_from(self, index: int): #Yields (target index, travel_time) for the outgoing edges of a station, in insertion order.
+
+        edge = self._first_edge[index]
+        while edge != -1:
+            travel_time = self._edge_time[edge]
+            yield self._edge_target[edge], int(travel_time) if travel_time.is_integer() else travel_time
+            edge = self._edge_next[edge]
+
+
+    def state_graph(self) -> StateGraph: #Returns the compiled state graph, rebuilding it only after the network changed.
+
+        if self._state_graph is None:
+            self._state_graph = StateGraph(self)
+        return self._state_graph
+
+    def add_search_sink(self, sink: Callable[[SearchStats], None]) -> None: #Registers a callback that receives the SearchStats of every route query.
+
+        self._search_sinks.append(sink)
+
+    def remove_search_sink(self, sink: Callable[[SearchStats], None]) -> None:
+
+        self._search_sinks.remove(sink)
+
+    def enable_search_histograms(self) -> SearchHistogram: #Starts aggregating every route query into self.search_histograms.
+
+        if self.search_histograms is None:
+            self.search_histograms = SearchHistogram()
+            self.add_search_sink(self.search_histograms)
+        return self.search_histograms
+
+    def find_min_transfers_route(self, start_id: str, end_id: str,
+                                 max_transfers: Optional[int] = None,
+                                 stats: Optional[SearchStats] = None) -> Optional[List[Station]]:
+        #Uses a 0-1 BFS approach on the state graph to find a route with the minimum number of line transfers.
+        #Cost = 0 for RIDE edges, otherwise (TRANSFER or WALK) cost = 1.
+        #Routes needing more than max_transfers line changes are discarded.
+        #If stats is given or search sinks are registered, the query is instrumented.
+        #Raises ValueError for a negative max_transfers.
+
+        _check_max_transfers(max_transfers)
+        if stats is None and self._search_sinks:
+            stats = SearchStats()
         if start_id not in self.stations or end_id not in self.stations:
+            # Unknown stations still count as a (failed) query for stats and sinks
+            if stats is not None:
+                self._finish_stats(stats, "min_transfers", start_id, end_id, None, 0, 0)
             return None
 
-        start_station = self.stations[start_id]
-        end_station = self.stations[end_id]
+        graph = self.state_graph()
+        start = self.stations[start_id]._index
+        goal = self.stations[end_id]._index
 
         dq = deque()
-        dq.append((start_station, [start_station], 0))
-        best = {(start_station.idx, start_station.line): 0}
+        dq.append((start, 0))
+        best = {start: 0}
+        parent: Dict[int, Optional[int]] = {start: None}
+        pushes = 1
+        stale = 0
+        result = None
+
+        # Instrumentation swaps in counting stand-ins here, never inside the loop
+        offsets, targets, kinds = graph.offsets, graph.targets, graph.kinds
+        edge_range = range
+        push_front, push_back = dq.appendleft, dq.append
+        if stats is not None:
+            t0 = time.perf_counter()
+            edge_range = _CountingRange()
+            stats.heap_max = 1
+
+            def push_front(item):
+                dq.appendleft(item)
+                if len(dq) > stats.heap_max:
+                    stats.heap_max = len(dq)
+
+            def push_back(item):
+                dq.append(item)
+                if len(dq) > stats.heap_max:
+                    stats.heap_max = len(dq)
 
         while dq:
-            current, route, transfers = dq.popleft()
-            if current.idx == end_station.idx:
-                return route
+            current, transfers = dq.popleft()
+            if current == goal:
+                result = graph.route(parent, current)
+                break
 
-            for neighbor, _ in current.neighbors:
-                cost = 0 if neighbor.line == current.line else 1
+            if transfers > best[current]:
+                stale += 1
+                continue
+
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                cost = 0 if kinds[e] == RIDE else 1
                 new_transfers = transfers + cost
-                key = (neighbor.idx, neighbor.line)
-                if key not in best or new_transfers < best[key]:
-                    best[key] = new_transfers
+                if max_transfers is not None and new_transfers > max_transfers:
+                    continue
+                if new_transfers < best.get(neighbor, new_transfers + 1):
+                    best[neighbor] = new_transfers
+                    parent[neighbor] = current
+                    pushes += 1
                     if cost == 0:
-                        dq.appendleft((neighbor, route + [neighbor], new_transfers))
+                        push_front((neighbor, new_transfers))
                     else:
-                        dq.append((neighbor, route + [neighbor], new_transfers))
-
-        return None
-
-    def find_fastest_route(self, start_id: str, end_id: str) -> Optional[Tuple[List[Station], int]]:
-        #Uses an A* search to find the fastest route based on travel times.
+                        push_back((neighbor, new_transfers))
+
+        if stats is not None:
+            stats.elapsed = time.perf_counter() - t0
+            stats.relaxations = edge_range.scanned
+            self._finish_stats(stats, "min_transfers", start_id, end_id, result,
+                               pushes, pushes - len(dq) - stale)
+        return result
+
+    def find_fastest_route(self, start_id: str, end_id: str,
+                           transfer_penalty: float = 0, walk_penalty: float = 0,
+                           max_transfers: Optional[int] = None,
+                           stats: Optional[SearchStats] = None) -> Optional[Tuple[List[Station], int]]:
+        #Uses an A* search on the state graph to find the fastest route based on travel times.
         #An Euclidean distance heuristic is applied, using station coordinates.
-        
+        #transfer_penalty / walk_penalty are added to the search cost of TRANSFER / WALK edges,
+        #and max_transfers caps the number of line changes. The returned time is the pure travel time.
+        #If stats is given or search sinks are registered, the query is instrumented.
+        #Raises ValueError for a negative penalty or max_transfers.
+
+        penalties = _penalties(transfer_penalty, walk_penalty)
+        _check_max_transfers(max_transfers)
+        if stats is None and self._search_sinks:
+            stats = SearchStats()
         if start_id not in self.stations or end_id not in self.stations:
+            # Unknown stations still count as a (failed) query for stats and sinks
+            if stats is not None:
+                self._finish_stats(stats, "fastest", start_id, end_id, None, 0, 0)
             return None
 
-        start_station = self.stations[start_id]
-        end_station = self.stations[end_id]
+        graph = self.state_graph()
+        start = self.stations[start_id]._index
+        goal = self.stations[end_id]._index
+        xs, ys = graph.xs, graph.ys
+        goal_x, goal_y = xs[goal], ys[goal]
 
-        def heuristic(current: Station, goal: Station) -> float:
-            dx = current.x - goal.x
-            dy = current.y - goal.y
+        # Without a transfer cap a state is just the station index,
+        # otherwise it is station * width + transfers used so far.
+        width = 1 if max_transfers is None else max_transfers + 1
+
+        def heuristic(node: int) -> float:
+            dx = xs[node] - goal_x
+            dy = ys[node] - goal_y
             return math.sqrt(dx * dx + dy * dy)
 
         counter = itertools.count()
-        initial_g = 0
-        initial_f = initial_g + heuristic(start_station, end_station)
-        pq = [(initial_f, next(counter), initial_g, start_station, [start_station])]
-        best = {start_station.idx: 0}
+        start_state = start * width
+        pq = [(heuristic(start), next(counter), 0, 0, start_state)]
+        best = {start_state: 0}
+        parent: Dict[int, Optional[int]] = {start_state: None}
+        stale = 0
+        result = None
+
+        # Instrumentation swaps in counting stand-ins here, never inside the loop
+        offsets, targets, times, kinds = graph.arrays
+        edge_range = range
+        push = heapq.heappush
+        if stats is not None:
+            t0 = time.perf_counter()
+            edge_range = _CountingRange()
+            stats.heap_max = 1
+
+            def push(heap, item):
+                heapq.heappush(heap, item)
+                if len(heap) > stats.heap_max:
+                    stats.heap_max = len(heap)
 
         while pq:
-            f, _, g, current, route = heapq.heappop(pq)
-            if current.idx == end_station.idx:
-                return route, g
+            f, _, g, time_so_far, state = heapq.heappop(pq)
+            current, transfers = divmod(state, width)
+            if current == goal:
+                result = graph.route(parent, state, width), time_so_far
+                break
 
-            if g > best.get(current.idx, float('inf')):
+            if g > best.get(state, float('inf')):
+                stale += 1
                 continue
 
-            for neighbor, travel_time in current.neighbors:
-                new_g = g + travel_time
-                if new_g < best.get(neighbor.idx, float('inf')):
-                    best[neighbor.idx] = new_g
-                    new_f = new_g + heuristic(neighbor, end_station)
-                    heapq.heappush(pq, (new_f, next(counter), new_g, neighbor, route + [neighbor]))
+            for e in edge_range(offsets[current], offsets[current + 1]):
+                neighbor = targets[e]
+                travel_time = times[e]
+                kind = kinds[e]
+                new_state = neighbor * width + transfers
+                if kind != RIDE and max_transfers is not None:
+                    if transfers == max_transfers:
+                        continue
+                    new_state += 1
+                new_g = g + travel_time + penalties[kind]
+                if new_g < best.get(new_state, float('inf')):
+                    best[new_state] = new_g
+                    parent[new_state] = state
+                    new_f = new_g + heuristic(neighbor)
+                    push(pq, (new_f, next(counter), new_g, time_so_far + travel_time, new_state))
+
+        if stats is not None:
+            stats.elapsed = time.perf_counter() - t0
+            stats.relaxations = edge_range.scanned
+            # The tie-break counter already numbers every push
+            pushes = next(counter)
+            self._finish_stats(stats, "fastest", start_id, end_id, result,
+                               pushes, pushes - len(pq) - stale)
+        return result
+
+    def k_shortest_routes(self, start_id: str, end_id: str, k: int = 3,
+                          max_similarity: float = 0.8,
+                          transfer_penalty: float = 0, walk_penalty: float = 0) -> List[Tuple[List[Station], int]]:
+        #Yen's algorithm for up to k loopless alternative routes, best first, as (route, travel_time) pairs.
+        #Yen enumerates simple state paths in cost order; a path is returned only if it visits no station
+        #name twice (apart from a transfer inside one station) and if at most max_similarity of its travel
+        #time runs over station-to-station connections of an already returned route (1.0 disables the filter).
+        #Penalties work as in find_fastest_route.
+        #One reverse shortest-path tree to the destination is shared by all spur searches: a spur whose
+        #tree path is still allowed is taken straight from the tree, otherwise the tree distances serve
+        #as an exact A* heuristic that stops at the first state with an allowed tree path.
+        #The tree is grown on demand (a resumable reverse Dijkstra), so it only settles the states within
+        #reach of the routes looked at, and each path is only spurred from where it left its parent (Lawler).
+
+        penalties = _penalties(transfer_penalty, walk_penalty)
+        if start_id not in self.stations or end_id not in self.stations or k <= 0:
+            return []
+
+        graph = self.state_graph()
+        offsets, targets, times, kinds = graph.arrays
+        name_ids = graph.name_ids
+        start = self.stations[start_id]._index
+        goal = self.stations[end_id]._index
+        reverse_offsets, sources, reverse_times, reverse_kinds = graph.reverse_arrays()
+
+        # Reverse tree: to_goal / next_hop hold the settled states only, tentative / frontier the rest
+        to_goal: Dict[int, float] = {}
+        next_hop: Dict[int, int] = {}
+        tentative: Dict[int, Tuple[float, int]] = {goal: (0, -1)}
+        frontier = [(0, goal)]
+
+        def distance(node: int) -> float: #Exact cost from node to the goal, settling the tree up to it (inf if unreachable).
+            while node not in to_goal and frontier:
+                d, u = heapq.heappop(frontier)
+                if u in to_goal:
+                    continue
+                to_goal[u] = d
+                next_hop[u] = tentative.pop(u)[1]
+                for e in range(reverse_offsets[u], reverse_offsets[u + 1]):
+                    w = sources[e]
+                    nd = d + reverse_times[e] + penalties[reverse_kinds[e]]
+                    if w not in to_goal and nd < tentative.get(w, (math.inf,))[0]:
+                        tentative[w] = (nd, u)
+                        heapq.heappush(frontier, (nd, w))
+            return to_goal.get(node, math.inf)
+
+        if distance(start) == math.inf:
+            return []
+
+        edge_costs: Dict[Tuple[int, int], Tuple[float, int]] = {}
+
+        def edge(u: int, v: int) -> Tuple[float, int]: #Cheapest (search cost, travel_time) of the connection u -> v, memoised.
+            cost = edge_costs.get((u, v))
+            if cost is None:
+                cost = edge_costs[(u, v)] = min((times[e] + penalties[kinds[e]], times[e])
+                                                for e in range(offsets[u], offsets[u + 1]) if targets[e] == v)
+            return cost
+
+        def tree_path(node: int) -> List[int]:
+            path = [node]
+            while node != goal:
+                node = next_hop[node]
+                path.append(node)
+            return path
+
+        def has_loop(path: List[int]) -> bool: #True if the route comes back to a station name it already left.
+            names = [name_ids[s] for s in path]
+            runs = [n for i, n in enumerate(names) if i == 0 or n != names[i - 1]]
+            return len(runs) != len(set(runs))
+
+        def travel_time(path: List[int]) -> int:
+            return sum(edge(u, v)[1] for u, v in zip(path, path[1:]))
+
+        def connections(path: List[int]) -> Dict[Tuple[int, int], int]: #Travel time per station-name pair ridden or walked.
+            links = {}
+            for u, v in zip(path, path[1:]):
+                a, b = name_ids[u], name_ids[v]
+                if a != b:
+                    links[(min(a, b), max(a, b))] = edge(u, v)[1]
+            return links
+
+        first = tree_path(start)
+        found = [first]                           # every path taken from the candidates, in cost order
+        deviations = [0]                          # index on found[j] where it left the path it was spurred from
+        seen = {tuple(first)}
+        candidates = []                           # heap of (cost, counter, root, spur index, head, tail), see below
+        counter = itertools.count()
+        accepted: List[Tuple[List[int], int]] = []
+        accepted_connections = []
+        if not has_loop(first):
+            accepted.append((first, travel_time(first)))
+            accepted_connections.append(connections(first))
+        max_paths = 10 * k                        # bounds the work when the filters reject a lot
+
+        while len(accepted) < k and len(found) < max_paths:
+            last = found[-1]
+            deviation = deviations[-1]
+
+            # The spur at last[i] must avoid the states last[:i]. position[s] is the index of s on last,
+            # and reach[s] the smallest such index met on the tree path from s, memoised once for all
+            # spurs: the tree path from s is usable for spur i iff reach[s] > i.
+            position = {node: j for j, node in enumerate(last)}
+            reach = {goal: position[goal]}
+
+            def tree_reach(node: int) -> float:
+                chain = []
+                while node not in reach:
+                    chain.append(node)
+                    node = next_hop[node]
+                value = reach[node]
+                for n in reversed(chain):
+                    value = min(value, position.get(n, math.inf))
+                    reach[n] = value
+                return reach[chain[0]] if chain else value
+
+            # The spur at last[i] must not reuse the next state of any found path that shares last[:i + 1].
+            # That is last[i + 1] itself, plus branches[i]: the next states of the paths that leave last
+            # right after last[i]. Only spurs from the deviation on are searched, so only paths sharing
+            # last[:deviation + 1] matter.
+            branches: Dict[int, List[int]] = {}
+            shared_root = last[:deviation + 1]
+            for p in found:
+                if p[:deviation + 1] != shared_root:
+                    continue
+                n = deviation + 1
+                limit = min(len(p), len(last))
+                while n < limit and p[n] == last[n]:
+                    n += 1
+                if n < len(p) and n < len(last):
+                    branches.setdefault(n - 1, []).append(p[n])
+
+            # Spurs before the deviation index share their root and removed edges with a spur of the parent
+            # path that was already searched, so only the new suffix is spurred (Lawler's refinement)
+            root_cost = sum(edge(u, v)[0] for u, v in zip(last[:deviation], last[1:deviation + 1]))
+            for i in range(deviation, len(last) - 1):
+                spur = last[i]
+                if i > deviation:
+                    root_cost += edge(last[i - 1], spur)[0]
+                removed = {last[i + 1], *branches.get(i, ())}
+
+                # Spur search: A* with the exact tree distances, stopped at the first state whose tree
+                # path is usable, which then completes an optimal spur. A candidate is kept as
+                # (root length i, head from the spur to that state, tail state) and only spelled out when popped.
+                hop = next_hop[spur]
+                if hop not in removed and tree_reach(hop) > i:
+                    heapq.heappush(candidates, (root_cost + to_goal[spur], next(counter), last, i, [spur], hop))
+                    continue
+                # Along a line the only neighbors are on the root or removed: nothing to search
+                for e in range(offsets[spur], offsets[spur + 1]):
+                    v = targets[e]
+                    if position.get(v, math.inf) >= i and v not in removed:
+                        break
+                else:
+                    continue
+
+                # Alongside, one state per step, the goal side: the states that reach the goal without the
+                # root or the spur. If that runs out first every spur path stays inside it after the first
+                # hop, so a spur cut off behind its root does not flood the network before it gives up.
+                region = {goal}
+                region_stack = [goal]
+                bounds = None
+                best = {spur: 0}
+                parent: Dict[int, Optional[int]] = {spur: None}
+                pq = [(to_goal[spur], 0, spur)]
+                while pq:
+                    if region_stack:
+                        x = region_stack.pop()
+                        for e in range(reverse_offsets[x], reverse_offsets[x + 1]):
+                            w = sources[e]
+                            if w not in region and position.get(w, math.inf) > i:
+                                region.add(w)
+                                region_stack.append(w)
+                        if not region_stack:
+                            bounds = region
+                    _, neg_g, u = heapq.heappop(pq)
+                    g = -neg_g
+                    if g > best[u] or (bounds is not None and u != spur and u not in bounds):
+                        continue
+                    if u != spur and tree_reach(u) > i:
+                        head = []
+                        node = parent[u]
+                        while node is not None:
+                            head.append(node)
+                            node = parent[node]
+                        head.reverse()
+                        heapq.heappush(candidates, (root_cost + g + to_goal[u], next(counter), last, i, head, u))
+                        break
+                    for e in range(offsets[u], offsets[u + 1]):
+                        v = targets[e]
+                        if position.get(v, math.inf) < i or (u == spur and v in removed):
+                            continue
+                        if bounds is not None and v not in bounds:
+                            continue
+                        h = distance(v)
+                        if h == math.inf:
+                            continue
+                        new_g = g + times[e] + penalties[kinds[e]]
+                        if new_g < best.get(v, math.inf):
+                            best[v] = new_g
+                            parent[v] = u
+                            # Deeper states win ties on f, which keeps the search close to the tree
+                            heapq.heappush(pq, (new_g + h, -new_g, v))
+
+            # Take the cheapest new candidate
+            path = None
+            while candidates:
+                _, _, root, i, head, tail = heapq.heappop(candidates)
+                path = root[:i] + head + tree_path(tail)
+                key = tuple(path)
+                if key not in seen:
+                    seen.add(key)
+                    break
+                path = None
+            if path is None:
+                break
+            found.append(path)
+            deviations.append(i)
+
+            if has_loop(path):
+                continue
+            links = connections(path)
+            total = travel_time(path)
+            if total and any(sum(t for c, t in links.items() if c in other) / total > max_similarity
+                             for other in accepted_connections):
+                continue
+            accepted.append((path, total))
+            accepted_connections.append(links)
+
+        return [([graph.stations[s] for s in path], travel) for path, travel in accepted]
+
+    def centrality(self, workers: Optional[int] = None, samples: Optional[int] = None, seed: int = 0,
+                   transfer_penalty: float = 0, walk_penalty: float = 0) -> 'NetworkCentrality':
+        #Betweenness (Brandes, weighted by travel time + penalties) of stations and connections, plus
+        #closeness / mean travel time, computed from every state or from `samples` random sources.
+        #Penalties shape the shortest routes; mean travel time and closeness are plain minutes along them.
+        #Sources are sharded over a process pool of `workers` processes (default: one per CPU);
+        #workers=1 runs everything in this process.
+
+        graph = self.state_graph()
+        n = len(graph)
+        penalties = _penalties(transfer_penalty, walk_penalty)
+        sources = list(range(n))
+        if samples is not None and samples < n:
+            import random
+            sources = sorted(random.Random(seed).sample(sources, samples))
+        scale = n / len(sources) if sources else 1.0
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(sources)))
+        if workers == 1:
+            parts = [_brandes(graph.arrays, penalties, sources)]
+        else:
+            # Imported here: multiprocessing is only needed by the analytics, not by route queries
+            from concurrent.futures import ProcessPoolExecutor
+
+            # A few chunks per worker evens out sources with very different search sizes
+            chunk_count = workers * 4
+            chunks = [sources[i::chunk_count] for i in range(chunk_count) if sources[i::chunk_count]]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_graph_worker,
+                                     initargs=(graph.arrays, penalties)) as pool:
+                parts = list(pool.map(_centrality_chunk, chunks))
+
+        station_bc = array('d', bytes(8 * n))
+        connection_bc = array('d', bytes(8 * len(graph.targets)))
+        mean_time = array('d', [math.nan]) * n
+        closeness = array('d', [math.nan]) * n
+        for node_bc, edge_bc, distances in parts:
+            for i, value in enumerate(node_bc):
+                station_bc[i] += value * scale
+            for i, value in enumerate(edge_bc):
+                connection_bc[i] += value * scale
+            for s, total, reached in distances:
+                if reached:
+                    mean_time[s] = total / reached
+                    closeness[s] = reached / total if total else math.inf
+                else:
+                    # Nothing reachable: never "instantly" reachable, and no closeness
+                    mean_time[s] = math.inf
+                    closeness[s] = 0.0
+
+        return NetworkCentrality(station_bc, connection_bc, mean_time, closeness)
+
+    def assign_demand(self, trips, workers: Optional[int] = None,
+                      transfer_penalty: float = 0, walk_penalty: float = 0) -> 'DemandAssignment':
+        #Routes an OD demand on fastest routes and returns the passenger load of every connection.
+        #trips is an iterable of (origin_id, destination_id, passengers) or a {(origin_id, destination_id): passengers} dict.
+        #Trips are grouped by origin and each origin needs a single shortest-path tree; origins are sharded
+        #over a process pool like centrality() (workers=1 runs in this process).
+        #Penalties work as in find_fastest_route; unknown station ids count as unassigned.
+
+        graph = self.state_graph()
+        penalties = _penalties(transfer_penalty, walk_penalty)
+        if isinstance(trips, dict):
+            trips = ((origin, destination, passengers) for (origin, destination), passengers in trips.items())
+
+        by_origin: Dict[int, Dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        total = 0.0
+        unknown = 0.0
+        stations = self.stations
+        for origin_id, destination_id, passengers in trips:
+            total += passengers
+            origin = stations.get(origin_id)
+            destination = stations.get(destination_id)
+            if origin is None or destination is None:
+                unknown += passengers
+                continue
+            by_origin[origin._index][destination._index] += passengers
+        demands = [(origin, dict(destinations)) for origin, destinations in by_origin.items()]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(demands)))
+        if workers == 1:
+            parts = [_assign_origins(graph.arrays, penalties, demands)]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunk_count = workers * 4
+            chunks = [demands[i::chunk_count] for i in range(chunk_count) if demands[i::chunk_count]]
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_graph_worker,
+                                     initargs=(graph.arrays, penalties)) as pool:
+                parts = list(pool.map(_assignment_chunk, chunks))
+
+        n = len(graph)
+        loads = array('d', bytes(8 * len(graph.targets)))
+        volumes = array('d', bytes(8 * n))
+        unassigned = unknown
+        for part_loads, part_volumes, part_unassigned in parts:
+            for e, value in part_loads.items():
+                loads[e] += value
+            for state, value in part_volumes.items():
+                volumes[state] += value
+            unassigned += part_unassigned
+
+        return DemandAssignment(loads, volumes, total, unassigned)
+
+    def _finish_stats(self, stats: SearchStats, algorithm: str, start_id: str, end_id: str,
+                      result, pushes: int, settled: int) -> None: #Completes the per-query counters and hands them to the search sinks.
+
+        stats.algorithm = algorithm
+        stats.start_id = start_id
+        stats.end_id = end_id
+        stats.found = result is not None
+        stats.pushes = pushes
+        stats.settled = settled
+        for sink in self._search_sinks:
+            sink(stats)
+
+
+class NetworkCentrality:
+    #Results of MetroNetwork.centrality(), as arrays indexed like the StateGraph:
+    #  station_betweenness[s]     shortest (source, target) state pairs passing through state s
+    #  connection_betweenness[e]  the same per directed connection, numbered as in StateGraph.edge_list()
+    #  mean_travel_time[s]        average plain travel time (no penalties) from s along the shortest routes to
+    #                             every state it can reach; inf when nothing is reachable
+    #  closeness[s]               1 / mean_travel_time[s] (0 when nothing is reachable)
+    #Pairs are ordered, so on the (symmetric) metro graph every route is counted once per direction.
+    #When only a sample of sources was used, betweenness is scaled up to the full network and the
+    #travel time / closeness of the states that were not a source are nan.
+
+    def __init__(self, station_betweenness: array, connection_betweenness: array,
+                 mean_travel_time: array, closeness: array):
+        self.station_betweenness = station_betweenness
+        self.connection_betweenness = connection_betweenness
+        self.mean_travel_time = mean_travel_time
+        self.closeness = closeness
+
+    def by_name(self, graph: StateGraph, values: array) -> Dict[str, float]: #Folds per-state values onto station names, keeping each name's largest value.
+        folded: Dict[str, float] = {}
+        for name_id, value in zip(graph.name_ids, values):
+            name = graph.names[name_id]
+            if value == value and value > folded.get(name, -math.inf):  # value == value skips nan
+                folded[name] = value
+        return folded
+
+
+class DemandAssignment:
+    #Result of MetroNetwork.assign_demand(): passenger loads of an all-or-nothing assignment on fastest routes.
+    #  connection_loads[e]  passengers riding / walking directed connection e (numbered as in StateGraph.edge_list())
+    #  station_volumes[s]   passengers whose route touches state s (boarding, alighting, transferring or passing)
+    #  passengers / unassigned   total demand and the part without any route
+
+    def __init__(self, connection_loads: array, station_volumes: array, passengers: float, unassigned: float):
+        self.connection_loads = connection_loads
+        self.station_volumes = station_volumes
+        self.passengers = passengers
+        self.unassigned = unassigned
+
+    def by_name_pair(self, graph: StateGraph) -> Dict[Tuple[str, str], float]: #Loads summed per station-name pair (both directions), transfers inside a station left out.
+        loads: Dict[Tuple[str, str], float] = defaultdict(float)
+        for (u, v), load in zip(graph.edge_list(), self.connection_loads):
+            a, b = graph.names[graph.name_ids[u]], graph.names[graph.name_ids[v]]
+            if load and a != b:
+                loads[(a, b) if a < b else (b, a)] += load
+        return dict(loads)
+
+
+# Graph arrays (StateGraph.arrays) and penalties installed in every analytics worker process by _init_graph_worker
+_worker_graph: Optional[Tuple[Tuple[array, array, array, array], Tuple[float, float, float]]] = None
+
+
+def _init_graph_worker(arrays: Tuple[array, array, array, array], penalties: Tuple[float, float, float]) -> None:
+    global _worker_graph
+    _worker_graph = (arrays, penalties)
+
+
+def _centrality_chunk(sources: List[int]) -> Tuple[List[float], List[float], List[Tuple[int, float, int]]]:
+    return _brandes(_worker_graph[0], _worker_graph[1], sources)
+
+
+def _assignment_chunk(demands: List[Tuple[int, Dict[int, float]]]) -> Tuple[Dict[int, float], Dict[int, float], float]:
+    return _assign_origins(_worker_graph[0], _worker_graph[1], demands)
+
+
+def _assign_origins(arrays: Tuple[array, array, array, array], penalties: Tuple[float, float, float],
+                    demands: List[Tuple[int, Dict[int, float]]]) -> Tuple[Dict[int, float], Dict[int, float], float]:
+    #All-or-nothing assignment of [(origin, {destination: passengers})]: one shortest-path tree per origin,
+    #stopped once every destination of that origin is settled. Demand is then pushed up the tree in
+    #reverse settling order, so every state and tree edge is touched once per origin, however many trips it has.
+    #The search buffers are reused and only their touched entries reset between origins, so an origin
+    #whose trips stay nearby costs what its search settles, not the size of the network.
+    #Returns sparse ({edge: load}, {state: volume}, unassigned passengers).
+    offsets, targets, times, kinds = arrays
+    n = len(offsets) - 1
+    loads: Dict[int, float] = defaultdict(float)
+    volumes: Dict[int, float] = defaultdict(float)
+    unassigned = 0.0
+    pop, push = heapq.heappop, heapq.heappush
+    dist = [math.inf] * n
+    pred = [-1] * n
+    pred_edge = [-1] * n
+    done = [False] * n
+
+    for origin, demand in demands:
+        order = []
+        remaining = len(demand)
+        dist[origin] = 0
+        pq = [(0, origin)]
+
+        while pq and remaining:
+            d, u = pop(pq)
+            if done[u]:
+                continue
+            done[u] = True
+            order.append(u)
+            if u in demand:
+                remaining -= 1
+            for e in range(offsets[u], offsets[u + 1]):
+                v = targets[e]
+                nd = d + times[e] + penalties[kinds[e]]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = u
+                    pred_edge[v] = e
+                    push(pq, (nd, v))
+
+        flow: Dict[int, float] = defaultdict(float)
+        for destination, passengers in demand.items():
+            if done[destination]:
+                flow[destination] += passengers
+            else:
+                unassigned += passengers
+        for w in reversed(order):
+            f = flow.get(w)
+            if not f:
+                continue
+            volumes[w] += f
+            if w != origin:
+                loads[pred_edge[w]] += f
+                flow[pred[w]] += f
+
+        # Every state given a distance was either settled or is still queued. A search over a good part
+        # of the network is cheaper to forget by allocating afresh than by resetting state by state.
+        if len(order) + len(pq) > n >> 3:
+            dist = [math.inf] * n
+            done = [False] * n
+        else:
+            for u in order:
+                dist[u] = math.inf
+                done[u] = False
+            for _, u in pq:
+                dist[u] = math.inf
+
+    return dict(loads), dict(volumes), unassigned
+
+
+def _brandes(arrays: Tuple[array, array, array, array], penalties: Tuple[float, float, float],
+             sources: List[int]) -> Tuple[List[float], List[float], List[Tuple[int, float, int]]]:
+    #Brandes' weighted betweenness accumulated over the given sources (one Dijkstra each).
+    #Returns (node betweenness, edge betweenness, [(source, total travel time, states reached)]).
+    #Travel times are plain minutes along the (penalised) shortest routes; on cost ties the shorter ride counts.
+    offsets, targets, times, kinds = arrays
+    n = len(offsets) - 1
+    node_bc = [0.0] * n
+    edge_bc = [0.0] * offsets[n]
+    distances = []
+    pop, push = heapq.heappop, heapq.heappush
+
+    for s in sources:
+        dist = [math.inf] * n
+        minutes = [0] * n
+        sigma = [0] * n
+        preds: List[Optional[List[Tuple[int, int]]]] = [None] * n
+        done = [False] * n
+        order = []
+        dist[s] = 0
+        sigma[s] = 1
+        preds[s] = []
+        pq = [(0, s)]
 
-        return None
+        while pq:
+            d, u = pop(pq)
+            if done[u]:
+                continue
+            done[u] = True
+            order.append(u)
+            for edge_id in range(offsets[u], offsets[u + 1]):
+                v = targets[edge_id]
+                travel_time = times[edge_id]
+                nd = d + travel_time + penalties[kinds[edge_id]]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    minutes[v] = minutes[u] + travel_time
+                    sigma[v] = sigma[u]
+                    preds[v] = [(u, edge_id)]
+                    push(pq, (nd, v))
+                elif nd == dist[v] and not done[v]:
+                    sigma[v] += sigma[u]
+                    preds[v].append((u, edge_id))
+                    if minutes[u] + travel_time < minutes[v]:
+                        minutes[v] = minutes[u] + travel_time
+
+        # Dependency accumulation in reverse settling order
+        delta = [0.0] * n
+        for w in reversed(order):
+            coeff = (1 + delta[w]) / sigma[w]
+            for v, edge_id in preds[w]:
+                c = sigma[v] * coeff
+                edge_bc[edge_id] += c
+                delta[v] += c
+            if w != s:
+                node_bc[w] += delta[w]
+
+        distances.append((s, sum(minutes[u] for u in order), len(order) - 1))
+
+    return node_bc, edge_bc, distances
 
 
 def collapse_route(route: List[Station]) -> List[str]: #Takes a list of Station objects and returns a list of station names,avoiding direct repetitions when station names are the same.
@@ -129,73 +1160,133 @@ def collapse_route(route: List[Station]) -> List[str]: #Takes a list of Station
 
 
 # 2) Building the graph for visualization
-def build_collapsed_graph(metro: MetroNetwork):
-    
+LINE_COLORS = {
+    "Kırmızı Hat": "red",
+    "Mavi Hat": "blue",
+    "Turuncu Hat": "orange",
+    "Yeşil Hat": "green",
+    "Sarı Hat": "yellow",
+    "Mor Hat": "purple",
+    "Lacivert Hat": "darkblue"
+}
+
+
+class CollapsedGraph:
+    #Lightweight name-level view of a MetroNetwork, used directly by the GUI renderer and click handler.
+    #Stations sharing a name become one node; nodes are integer ids into flat per-node lists and
+    #every edge is stored once as an (a, b) id pair with its min travel time, line set and color.
+
+    def __init__(self, names: List[str], xs: List[float], ys: List[float], lines: List[set],
+                 edge_a: List[int], edge_b: List[int], weights: List[int], edge_lines: List[set]):
+        self.names = names
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        self.xs = xs
+        self.ys = ys
+        self.lines = lines
+        self.edge_a = edge_a
+        self.edge_b = edge_b
+        self.weights = weights
+        self.edge_lines = edge_lines
+        # An edge gets its line color only if exactly one line runs along it
+        self.colors = [LINE_COLORS.get(next(iter(ls)), "black") if len(ls) == 1 else "black"
+                       for ls in edge_lines]
+
+        self.adjacency: List[List[int]] = [[] for _ in names]
+        for a, b in zip(edge_a, edge_b):
+            self.adjacency[a].append(b)
+            self.adjacency[b].append(a)
+
+        # Name-keyed views kept for the GUI
+        self.station_lines: Dict[str, set] = dict(zip(names, lines))
+        self.pos_map: Dict[str, Tuple[float, float]] = {name: (x, y) for name, x, y in zip(names, xs, ys)}
+
+    @property
+    def nodes(self) -> List[str]:
+        return self.names
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def neighbors(self, name: str) -> List[str]: #Returns the names of the nodes adjacent to the given station name.
+        return [self.names[j] for j in self.adjacency[self.index[name]]]
+
+    def to_networkx(self): #Optional export to a networkx Graph (networkx is imported only here).
+
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from(self.names)
+        for a, b, t, color in zip(self.edge_a, self.edge_b, self.weights, self.colors):
+            G.add_edge(self.names[a], self.names[b], weight=t, color=color)
+        return G
+
+
+def build_collapsed_graph(metro: MetroNetwork) -> CollapsedGraph:
+
     #Combines stations that share the same name into a single node.
     #Preserves edge colors based on the line name.
     #Averages the (x, y) positions for stations that share the same name.
-    
-    line_colors = {
-        "Kırmızı Hat": "red",
-        "Mavi Hat": "blue",
-        "Turuncu Hat": "orange",
-        "Yeşil Hat": "green",
-        "Sarı Hat": "yellow",
-        "Mor Hat": "purple",
-        "Lacivert Hat": "darkblue"
-    }
-
-    station_by_name = defaultdict(list)
-    for st in metro.stations.values():
-        station_by_name[st.name].append(st)
-
-    G = nx.Graph()
-    station_lines = {}
-    pos_map = {}
-
-    # Create nodes
-    for name, st_list in station_by_name.items():
-        all_lines = {st.line for st in st_list}
-        station_lines[name] = all_lines
-        G.add_node(name)
-        # Compute average x,y to represent this station name
-        avg_x = sum(st.x for st in st_list) / len(st_list)
-        avg_y = sum(st.y for st in st_list) / len(st_list)
-        pos_map[name] = (avg_x, avg_y)
-
-    # Build edges
-    edge_map = {}
-    for name, st_list in station_by_name.items():
-        for st in st_list:
-            for neighbor, travel_time in st.neighbors:
-                neighbor_name = neighbor.name
-                if name == neighbor_name:
-                    continue
-                edge_key = tuple(sorted((name, neighbor_name)))
-                same_line = st.line if st.line == neighbor.line else None
-
-                if edge_key not in edge_map:
-                    edge_map[edge_key] = (travel_time, set())
-                    if same_line:
-                        edge_map[edge_key][1].add(same_line)
-                else:
-                    old_time, old_lines = edge_map[edge_key]
-                    new_time = min(old_time, travel_time)
-                    new_line_set = set(old_lines)
-                    if same_line:
-                        new_line_set.add(same_line)
-                    edge_map[edge_key] = (new_time, new_line_set)
-
-    # Assign edges and colors
-    for (a, b), (t, lines_set) in edge_map.items():
-        if len(lines_set) == 1:
-            single_line = list(lines_set)[0]
-            edge_color = line_colors.get(single_line, "black")
+    #Works in integer ids over the compiled state graph: one pass groups name ids and sums
+    #coordinates, one pass over the adjacency merges edges under an integer key.
+
+    graph = metro.state_graph()
+
+    # Group states by station name: the network already integer-codes names in first-seen order.
+    # A renamed station can leave a name unused, so ids are compacted over the names in use.
+    used = sorted(set(graph.name_ids))
+    compact = [-1] * len(graph.names)
+    for g, name_id in enumerate(used):
+        compact[name_id] = g
+    group = [compact[name_id] for name_id in graph.name_ids]
+    names = [graph.names[name_id] for name_id in used]
+    line_names = graph.line_names
+    n = len(names)
+
+    count = [0] * n
+    sum_x = [0.0] * n
+    sum_y = [0.0] * n
+    lines = [set() for _ in range(n)]
+    for s, g in enumerate(group):
+        count[g] += 1
+        sum_x[g] += graph.xs[s]
+        sum_y[g] += graph.ys[s]
+        lines[g].add(line_names[graph.line_ids[s]])
+    xs = [sx / c for sx, c in zip(sum_x, count)]
+    ys = [sy / c for sy, c in zip(sum_y, count)]
+
+    # Merge edges: min travel time, union of the lines riding along them
+    edge_slot: Dict[int, int] = {}
+    edge_a: List[int] = []
+    edge_b: List[int] = []
+    weights: List[int] = []
+    edge_lines: List[set] = []
+    offsets, targets, times, kinds = graph.arrays
+    sources = [s for s in range(len(graph)) for _ in range(offsets[s + 1] - offsets[s])]
+    for s, t, travel_time, kind in zip(sources, targets, times, kinds):
+        a = group[s]
+        b = group[t]
+        if a == b:
+            continue
+        key = a * n + b if a < b else b * n + a
+        e = edge_slot.get(key)
+        if e is None:
+            edge_slot[key] = len(weights)
+            # Orient like the name-sorted keys used before, so curved edges bend the same way
+            if names[a] < names[b]:
+                edge_a.append(a)
+                edge_b.append(b)
+            else:
+                edge_a.append(b)
+                edge_b.append(a)
+            weights.append(travel_time)
+            edge_lines.append({line_names[graph.line_ids[s]]} if kind == RIDE else set())
         else:
-            edge_color = "black"
-        G.add_edge(a, b, weight=t, color=edge_color)
+            if travel_time < weights[e]:
+                weights[e] = travel_time
+            if kind == RIDE:
+                edge_lines[e].add(line_names[graph.line_ids[s]])
 
-    return G, station_lines, pos_map
+    return CollapsedGraph(names, xs, ys, lines, edge_a, edge_b, weights, edge_lines)
 
 
 # 3) Tkinter GUI
@@ -212,11 +1303,15 @@ class MetroSimulationGUI:
       - Toggle Edge Labels
       - Station Search + Highlight
       - Click on station for info
-      - Toggle node size scaling by line count
+      - Toggle node size scaling by betweenness centrality
+      - Edge widths by passenger load of an assigned OD demand
     """
-    def __init__(self, metro: MetroNetwork):
+    def __init__(self, metro: MetroNetwork, demand: Optional[DemandAssignment] = None):
+        _load_gui_modules()
         self.metro = metro
-        self.collapsed_graph, self.station_lines, self.pos_map = build_collapsed_graph(metro)
+        self.collapsed_graph = build_collapsed_graph(metro)
+        self.station_lines = self.collapsed_graph.station_lines
+        self.pos_map = self.collapsed_graph.pos_map
 
         self.last_route: Optional[List[str]] = None
         self.current_edge_index = 0
@@ -230,8 +1325,14 @@ class MetroSimulationGUI:
         self.highlight_station: Optional[str] = None
         # Enable/disable node info on click
         self.node_info_enabled = False
-        # Scale node size by line count
-        self.scale_nodes_by_line_count = False
+        # Scale node size by betweenness centrality (computed on first use)
+        self.scale_nodes_by_centrality = False
+        self.node_centrality: Optional[Dict[str, float]] = None
+        # Edge width by passenger load (only when an assigned demand is given)
+        self.edge_loads: Optional[Dict[Tuple[str, str], float]] = None
+        if demand is not None:
+            self.edge_loads = demand.by_name_pair(metro.state_graph())
+        self.show_edge_loads = self.edge_loads is not None
 
         # Main window
         self.window = tk.Tk()
@@ -274,7 +1375,7 @@ class MetroSimulationGUI:
         self.result_label.pack(side=tk.LEFT, anchor="w", padx=5)
 
         # Create a matplotlib Figure
-        self.figure = plt.Figure(figsize=(10, 6), dpi=100)
+        self.figure = Figure(figsize=(10, 6), dpi=100)
         self.ax = self.figure.add_subplot(111)
 
         # Initial backgrounds
@@ -343,7 +1444,7 @@ class MetroSimulationGUI:
         self.route_type_combo = ttk.Combobox(
             self.frame_controls,
             textvariable=self.route_type_var,
-            values=["Fastest Route", "Minimum Transfers Route"]
+            values=["Fastest Route", "Minimum Transfers Route", "Alternative Routes"]
         )
         self.route_type_combo.grid(row=0, column=5, padx=5, pady=5)
         self.route_type_combo.current(0)
@@ -378,7 +1479,7 @@ class MetroSimulationGUI:
         self.save_png_button = ttk.Button(self.frame_extra, text="Save Graph", command=self.save_graph_as_png)
         self.save_png_button.pack(side=tk.LEFT, padx=5)
 
-    def create_new_features_controls(self): #New feature controls: edge labels toggle, station search, node info toggle, node scaling toggle
+    def create_new_features_controls(self): #New feature controls: edge labels toggle, station search, node info toggle, node scaling toggle, load widths toggle
 
         self.toggle_edge_labels_button = ttk.Button(
             self.frame_new,
@@ -411,18 +1512,27 @@ class MetroSimulationGUI:
         # Scale node size
         self.scale_node_button = ttk.Button(
             self.frame_new,
-            text="Scale Nodes by Line Count",
+            text="Scale Nodes by Centrality",
             command=self.toggle_node_scaling
         )
         self.scale_node_button.pack(side=tk.LEFT, padx=10)
 
+        # Edge width by passenger load
+        self.edge_loads_button = ttk.Button(
+            self.frame_new,
+            text="Toggle Passenger Loads",
+            command=self.toggle_edge_loads,
+            state=tk.NORMAL if self.edge_loads is not None else tk.DISABLED
+        )
+        self.edge_loads_button.pack(side=tk.LEFT, padx=10)
+
     def get_station_names(self): # Returns the sorted list of collapsed station names in the graph.
 
         return sorted(list(self.collapsed_graph.nodes))
 
     def draw_graph(self, highlight_route: Optional[List[str]] = None):
         
-        #Draws the network graph using matplotlib and networkx.
+        #Draws the network graph with plain matplotlib artists from the collapsed graph.
         #If highlight_route is provided, those edges are highlighted.
         
         self.ax.clear()
@@ -445,106 +1555,97 @@ class MetroSimulationGUI:
             multi_node_color = "#D3D3D3"
             edge_node_color = "#000000"
 
-        # Retrieve edge colors
-        edge_colors = [self.collapsed_graph[u][v]["color"] for u, v in self.collapsed_graph.edges]
+        graph = self.collapsed_graph
+        pos = list(zip(graph.xs, graph.ys))
 
-        # Identify multi-line vs single-line stations
-        multi_line_stations = [n for n in self.collapsed_graph.nodes if len(self.station_lines[n]) > 1]
-        single_line_stations = [n for n in self.collapsed_graph.nodes if len(self.station_lines[n]) == 1]
+        # Identify multi-line vs single-line stations (node order = graph.names)
+        line_counts = [len(lines) for lines in graph.lines]
 
         # Node size logic
-        if self.scale_nodes_by_line_count:
-            # The more lines a station has, the bigger the node
-            # Let's say base size is 600, plus 200 for each line beyond the first
-            node_sizes = {}
-            for n in self.collapsed_graph.nodes:
-                line_count = len(self.station_lines[n])
-                node_sizes[n] = 600 + 200*(line_count - 1 if line_count>1 else 0)
+        if self.scale_nodes_by_centrality and self.node_centrality:
+            # The more shortest paths run through a station, the bigger the node: 400 up to 2000
+            top = max(self.node_centrality.values()) or 1.0
+            node_sizes = [400 + 1600 * self.node_centrality.get(name, 0.0) / top for name in graph.names]
         else:
             # All single-line = 600, multi-line = 700
-            node_sizes = {}
-            for n in single_line_stations:
-                node_sizes[n] = 600
-            for n in multi_line_stations:
-                node_sizes[n] = 700
-
-        # If a station is "searched for," highlight it
-        # We'll store a separate dictionary for node colors
-        node_colors_map = {}
-        for n in self.collapsed_graph.nodes:
-            node_colors_map[n] = single_node_color
-
-        for n in multi_line_stations:
-            node_colors_map[n] = multi_node_color
-
-        if self.highlight_station and self.highlight_station in self.collapsed_graph.nodes:
-            # Let's highlight it in green
-            node_colors_map[self.highlight_station] = "#008000"
-
-        # Convert node_colors_map to a list in the same order as .nodes
-        node_colors = [node_colors_map[n] for n in self.collapsed_graph.nodes]
+            node_sizes = [700 if count > 1 else 600 for count in line_counts]
+
+        node_colors = [multi_node_color if count > 1 else single_node_color for count in line_counts]
+
+        # If a station is "searched for," highlight it in green
+        if self.highlight_station and self.highlight_station in graph:
+            node_colors[graph.index[self.highlight_station]] = "#008000"
+
+        # Edge width logic
+        if self.show_edge_loads and self.edge_loads:
+            # Passengers on the connection (both directions): 1 for an unused edge up to 9 for the busiest
+            top = max(self.edge_loads.values()) or 1.0
+            names = graph.names
+            edge_widths = [
+                1 + 8 * self.edge_loads.get((names[a], names[b]) if names[a] < names[b] else (names[b], names[a]), 0.0) / top
+                for a, b in zip(graph.edge_a, graph.edge_b)
+            ]
+        else:
+            edge_widths = [2] * len(graph.edge_a)
 
-        # Convert node_sizes to a list in the same order
-        node_sizes_list = [node_sizes[n] for n in self.collapsed_graph.nodes]
+        # Draw edges
+        for a, b, color, width in zip(graph.edge_a, graph.edge_b, graph.colors, edge_widths):
+            self.ax.add_patch(mpatches.FancyArrowPatch(
+                pos[a], pos[b],
+                arrowstyle="-",
+                connectionstyle='arc3,rad=0.1',
+                color=color,
+                linewidth=width,
+                alpha=0.8,
+                zorder=1
+            ))
 
         # Draw nodes
-        nx.draw_networkx_nodes(
-            self.collapsed_graph,
-            self.pos_map,
-            node_color=node_colors,
-            node_shape="o",
+        self.ax.scatter(
+            graph.xs,
+            graph.ys,
+            c=node_colors,
+            marker="o",
             edgecolors=edge_node_color,
             linewidths=1.2,
-            node_size=node_sizes_list,
-            ax=self.ax
-        )
-
-        # Draw edges
-        nx.draw_networkx_edges(
-            self.collapsed_graph,
-            self.pos_map,
-            width=2,
-            alpha=0.8,
-            connectionstyle='arc3,rad=0.1',
-            edge_color=edge_colors,
-            ax=self.ax
+            s=node_sizes,
+            zorder=2
         )
 
         # Edge labels (travel times)
         if self.show_edge_labels:
-            edge_labels = nx.get_edge_attributes(self.collapsed_graph, "weight")
-            nx.draw_networkx_edge_labels(
-                self.collapsed_graph,
-                self.pos_map,
-                edge_labels=edge_labels,
-                label_pos=0.5,
-                font_color=label_font_color,
-                font_size=8,
-                bbox=dict(boxstyle='round,pad=0.3', fc=label_box_color, ec='none', alpha=0.7),
-                ax=self.ax
-            )
+            for a, b, t in zip(graph.edge_a, graph.edge_b, graph.weights):
+                self.ax.text(
+                    (pos[a][0] + pos[b][0]) / 2,
+                    (pos[a][1] + pos[b][1]) / 2,
+                    str(t),
+                    color=label_font_color,
+                    fontsize=8,
+                    ha="center",
+                    va="center",
+                    bbox=dict(boxstyle='round,pad=0.3', fc=label_box_color, ec='none', alpha=0.7),
+                    zorder=3
+                )
 
         # Station (node) labels
-        nx.draw_networkx_labels(
-            self.collapsed_graph,
-            self.pos_map,
-            font_size=9,
-            font_color=label_font_color,
-            ax=self.ax
-        )
+        for name, (x, y) in zip(graph.names, pos):
+            self.ax.text(x, y, name, fontsize=9, color=label_font_color, ha="center", va="center", zorder=4)
 
         # Highlight route if given
         if highlight_route and len(highlight_route) > 1:
-            route_edges = [(highlight_route[i], highlight_route[i+1]) for i in range(len(highlight_route) - 1)]
-            nx.draw_networkx_edges(
-                self.collapsed_graph,
-                self.pos_map,
-                edgelist=route_edges,
-                edge_color="#FF00FF",
-                width=4,
-                connectionstyle='arc3,rad=0.2',
-                ax=self.ax
-            )
+            for i in range(len(highlight_route) - 1):
+                self.ax.add_patch(mpatches.FancyArrowPatch(
+                    graph.pos_map[highlight_route[i]],
+                    graph.pos_map[highlight_route[i + 1]],
+                    arrowstyle="-",
+                    connectionstyle='arc3,rad=0.2',
+                    color="#FF00FF",
+                    linewidth=4,
+                    zorder=1.5
+                ))
+
+        self.ax.autoscale_view()
+        self.ax.tick_params(axis="both", which="both", bottom=False, left=False, labelbottom=False, labelleft=False)
 
         # Optionally show legend
         if self.show_legend:
@@ -604,6 +1705,21 @@ class MetroSimulationGUI:
                 self.result_label.config(text="No route found!")
                 self.last_route = None
                 self.draw_graph()
+        elif route_type == "Alternative Routes":
+            # Up to three alternatives; the best one is highlighted
+            alternatives = self.metro.k_shortest_routes(start_station.idx, end_station.idx, k=3)
+            if alternatives:
+                lines = []
+                for i, (route, total_time) in enumerate(alternatives, start=1):
+                    lines.append(f"{i}) {' -> '.join(collapse_route(route))} ({total_time} min)")
+                collapsed = collapse_route(alternatives[0][0])
+                self.last_route = collapsed
+                self.result_label.config(text="Alternative Routes:\n" + "\n".join(lines))
+                self.draw_graph(highlight_route=collapsed)
+            else:
+                self.result_label.config(text="No route found!")
+                self.last_route = None
+                self.draw_graph()
         else:
             # Minimum Transfers Route
             route = self.metro.find_min_transfers_route(start_station.idx, end_station.idx)
@@ -707,7 +1823,7 @@ class MetroSimulationGUI:
     def search_station(self): #Highlights the station typed in the search box (if it exists).
         
         station_name = self.search_var.get().strip()
-        if station_name in self.collapsed_graph.nodes:
+        if station_name in self.collapsed_graph:
             self.highlight_station = station_name
             self.result_label.config(text=f"Station '{station_name}' is highlighted in green.")
         else:
@@ -725,9 +1841,18 @@ class MetroSimulationGUI:
             self.info_toggle_button.config(text="Enable Node Info")
             self.result_label.config(text="Node info on click is disabled.")
 
-    def toggle_node_scaling(self): #Toggles whether node sizes are scaled by the number of lines.
+    def toggle_node_scaling(self): #Toggles whether node sizes are scaled by station betweenness centrality.
         
-        self.scale_nodes_by_line_count = not self.scale_nodes_by_line_count
+        self.scale_nodes_by_centrality = not self.scale_nodes_by_centrality
+        if self.scale_nodes_by_centrality and self.node_centrality is None:
+            # A station name takes the value of its busiest platform (one state per line)
+            centrality = self.metro.centrality(workers=1)
+            self.node_centrality = centrality.by_name(self.metro.state_graph(), centrality.station_betweenness)
+        self.draw_graph(self.last_route)
+
+    def toggle_edge_loads(self): #Toggles whether edge widths show the passenger loads of the assigned demand.
+
+        self.show_edge_loads = not self.show_edge_loads
         self.draw_graph(self.last_route)
 
     def on_click_station(self, event): #If node info is enabled, checks if the click is near a station and displays station info in the result label.
@@ -757,7 +1882,7 @@ class MetroSimulationGUI:
             lines_str = ", ".join(sorted(lines))
             # If we want neighbor info, we can gather from the original BFS data:
             # in collapsed_graph, the neighbors are also collapsed by name.
-            neighbors = list(self.collapsed_graph[found_station].keys())
+            neighbors = self.collapsed_graph.neighbors(found_station)
             info = f"Station: {found_station}\nLines: {lines_str}\nNeighbors: {', '.join(neighbors)}"
             self.result_label.config(text=info)
 
@@ -850,5 +1975,15 @@ if __name__ == "__main__":
     metro.add_connection("Y4", "P4", 6)   # Kozyatağı (Y4) - Oran (P4)
     metro.add_connection("T5", "K5", 10)  # Gazino (T5) - Sincan (K5)
 
+    # Example daily demand (passengers per origin/destination pair)
+    demand = metro.assign_demand({
+        ("K4", "M4"): 1200,
+        ("K5", "Y3"): 400,
+        ("T1", "M1"): 900,
+        ("L4", "K1"): 1500,
+        ("S3", "P1"): 300,
+        ("M1", "T4"): 700,
+    }, workers=1)
+
     # Launch the GUI
-    MetroSimulationGUI(metro) 
+    MetroSimulationGUI(metro, demand) 
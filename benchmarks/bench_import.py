@@ -0,0 +1,70 @@
+# Import-time benchmark for the routing core.
+# Imports YasinEkici_MetroSimulation in fresh interpreters, reports the median wall time and
+# fails (exit code 1) if it exceeds the budget or pulls in any GUI / plotting module.
+#
+#   python benchmarks/bench_import.py [--budget-ms 50] [--runs 15]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "YasinEkici_MetroSimulation"
+FORBIDDEN = ("tkinter", "matplotlib", "networkx", "numpy")
+
+PROBE = f"""
+import sys, time
+t0 = time.perf_counter()
+import {MODULE}
+elapsed = time.perf_counter() - t0
+loaded = [m for m in {FORBIDDEN!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+
+def measure_once(env: dict) -> tuple: #Runs one cold import in a subprocess; returns (seconds, loaded forbidden modules).
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    elapsed = float(out[0])
+    loaded = out[1].split(",") if len(out) > 1 else []
+    return elapsed, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the routing core.")
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    # Measure the steady state of a deployed worker: the first run writes the bytecode cache,
+    # which PYTHONDONTWRITEBYTECODE would otherwise turn into a full compile on every run
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    measure_once(env)
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, loaded = measure_once(env)
+        if loaded:
+            print(f"FAIL: importing {MODULE} loaded {', '.join(loaded)}")
+            return 1
+        timings.append(elapsed * 1000)
+
+    median = statistics.median(timings)
+    print(f"{MODULE} import: median {median:.2f} ms, max {max(timings):.2f} ms over {args.runs} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        print("FAIL: core import is over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
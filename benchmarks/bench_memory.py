@@ -0,0 +1,57 @@
+# Memory benchmark for the station model.
+# Builds a synthetic multi-line network and reports, via tracemalloc, the bytes allocated
+# per station (add_station) and per bidirectional connection (add_connection), then what the
+# compiled state graph adds: every route query builds it first, so that is the footprint in use.
+#
+#   python benchmarks/bench_memory.py [--stations 100000] [--line-length 50]
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from YasinEkici_MetroSimulation import MetroNetwork
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Memory benchmark for the station model.")
+    parser.add_argument("--stations", type=int, default=100_000)
+    parser.add_argument("--line-length", type=int, default=50)
+    args = parser.parse_args()
+
+    n, length = args.stations, args.line_length
+    # Ids, names and line names are created before tracing: they belong to the caller, not the model.
+    ids = [f"S{i}" for i in range(n)]
+    names = [f"Station {i % (n // 2 or 1)}" for i in range(n)]  # every name is shared by two lines
+    lines = [f"Line {i // length}" for i in range(n)]
+    connections = [(ids[i], ids[i + 1], 3) for i in range(n - 1) if (i + 1) % length]
+    connections += [(ids[i], ids[i + n // 2], 2) for i in range(0, n // 2, length)]  # interchanges
+
+    tracemalloc.start()
+    metro = MetroNetwork()
+    base, _ = tracemalloc.get_traced_memory()
+    for i in range(n):
+        metro.add_station(ids[i], names[i], lines[i], x=float(i % 1000), y=float(i // 1000))
+    after_stations, _ = tracemalloc.get_traced_memory()
+    for a, b, t in connections:
+        metro.add_connection(a, b, t)
+    after_edges, _ = tracemalloc.get_traced_memory()
+    metro.state_graph()
+    after_graph, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_station = (after_stations - base) / n
+    per_edge = (after_edges - after_stations) / len(connections)
+    print(f"stations: {n}, connections: {len(connections)}")
+    print(f"bytes per station:             {per_station:8.1f}")
+    print(f"bytes per connection:          {per_edge:8.1f}")
+    print(f"state graph per station:       {(after_graph - after_edges) / n:8.1f}")
+    print(f"total per station after query: {(after_graph - base) / n:8.1f}")
+    print(f"peak traced memory:            {peak / 1e6:8.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
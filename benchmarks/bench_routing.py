@@ -0,0 +1,210 @@
+# Routing benchmark suite.
+# For every generator x size it builds a synthetic network and records:
+#   - build / compile time, and the peak RSS of the whole process so far (informational: it only grows
+#     from case to case, so compare.py leaves it out; not available on Windows)
+#   - find_fastest_route and find_min_transfers_route: per-query latency percentiles,
+#     nodes expanded, heap/queue pushes, edges relaxed and queue high-water mark (from SearchStats),
+#     traced peak memory of the searches
+#   - build_collapsed_graph time and traced peak memory
+#   - draw_graph time on an off-screen canvas (small sizes only, needs matplotlib)
+# Results are written as JSON; compare two runs with benchmarks/compare.py.
+#
+#   python benchmarks/bench_routing.py --sizes 1000,10000,100000 --output bench.json
+#   python benchmarks/bench_routing.py --generators multiline --sizes 1000000 --queries 20
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import YasinEkici_MetroSimulation as metro_sim
+from generators import GENERATORS
+
+
+def percentile(sorted_values: list, q: float) -> float: #Nearest-rank percentile of an already sorted list.
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def bench_search(search, pairs: list, traced_queries: int) -> dict: #Times search(start, end) over all pairs, then collects its counters.
+    latencies = []
+    found = 0
+    for start, end in pairs:
+        t0 = time.perf_counter()
+        result = search(start, end)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        found += result is not None
+
+    # Counters come from a separate instrumented pass so the latencies measure the uninstrumented search
+    settled = []
+    pushes = []
+    relaxations = []
+    heap_max = []
+    for start, end in pairs:
+        stats = metro_sim.SearchStats()
+        search(start, end, stats=stats)
+        settled.append(stats.settled)
+        pushes.append(stats.pushes)
+        relaxations.append(stats.relaxations)
+        heap_max.append(stats.heap_max)
+
+    # Memory is traced in a separate pass so tracemalloc does not distort the latencies
+    tracemalloc.start()
+    for start, end in pairs[:traced_queries]:
+        search(start, end)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "queries": len(pairs),
+        "found": found,
+        "p50_ms": percentile(latencies, 50),
+        "p90_ms": percentile(latencies, 90),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+        "settled_mean": sum(settled) / len(settled) if settled else 0.0,
+        "pushes_mean": sum(pushes) / len(pushes) if pushes else 0.0,
+        "relaxations_mean": sum(relaxations) / len(relaxations) if relaxations else 0.0,
+        "heap_max_mean": sum(heap_max) / len(heap_max) if heap_max else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+def bench_collapse(metro) -> dict: #Times build_collapsed_graph and traces its peak memory.
+    t0 = time.perf_counter()
+    metro_sim.build_collapsed_graph(metro)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    metro_sim.build_collapsed_graph(metro)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time_ms": elapsed * 1000, "peak_kb": peak / 1024}
+
+
+def bench_assign(metro, pairs: list) -> dict: #Times assign_demand for one passenger per pair, in this process.
+    trips = [(start, end, 1) for start, end in pairs]
+    t0 = time.perf_counter()
+    metro.assign_demand(trips, workers=1)
+    return {"time_ms": (time.perf_counter() - t0) * 1000}
+
+
+def bench_draw(metro, route: list, repeats: int = 3) -> dict: #Times draw_graph on an off-screen Agg canvas, or returns None without matplotlib.
+    try:
+        metro_sim._load_gui_modules()
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError:
+        return None
+
+    # A GUI object without a Tk window: only the state draw_graph reads is set up
+    gui = metro_sim.MetroSimulationGUI.__new__(metro_sim.MetroSimulationGUI)
+    gui.collapsed_graph = metro_sim.build_collapsed_graph(metro)
+    gui.station_lines = gui.collapsed_graph.station_lines
+    gui.pos_map = gui.collapsed_graph.pos_map
+    gui.dark_mode = False
+    gui.show_legend = True
+    gui.show_edge_labels = True
+    gui.highlight_station = None
+    gui.scale_nodes_by_centrality = False
+    gui.show_edge_loads = False
+    gui.edge_loads = None
+    gui.figure = metro_sim.Figure(figsize=(10, 6), dpi=100)
+    gui.ax = gui.figure.add_subplot(111)
+    gui.canvas = FigureCanvasAgg(gui.figure)
+
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        gui.draw_graph(highlight_route=route)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return {"time_ms": min(timings)}
+
+
+def run_case(generator: str, size: int, args) -> dict:
+    t0 = time.perf_counter()
+    metro = GENERATORS[generator](size, seed=args.seed)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    metro.state_graph()
+    compile_s = time.perf_counter() - t0
+
+    rng = random.Random(args.seed)
+    ids = list(metro.stations)
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(args.queries)]
+
+    result = {
+        "generator": generator,
+        "size": size,
+        "stations": len(metro.stations),
+        "edges": len(metro._edge_target) // 2,
+        "build_s": build_s,
+        "compile_s": compile_s,
+        "fastest": bench_search(metro.find_fastest_route, pairs, args.traced_queries),
+        "min_transfers": bench_search(metro.find_min_transfers_route, pairs, args.traced_queries),
+        "assign": bench_assign(metro, pairs),
+        "collapse": bench_collapse(metro),
+        "draw": None,
+    }
+    if size <= args.draw_max:
+        fastest = metro.find_fastest_route(*pairs[0]) if pairs else None
+        route = metro_sim.collapse_route(fastest[0]) if fastest else None
+        result["draw"] = bench_draw(metro, route)
+    # ru_maxrss is in kilobytes on Linux (bytes on macOS) and only ever grows within the process
+    result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Routing benchmark suite.")
+    parser.add_argument("--generators", default=",".join(GENERATORS))
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--traced-queries", type=int, default=10)
+    parser.add_argument("--draw-max", type=int, default=2000, help="largest size draw_graph is timed for")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_output.json")
+    args = parser.parse_args()
+
+    results = []
+    for generator in args.generators.split(","):
+        for size in (int(s) for s in args.sizes.split(",")):
+            case = run_case(generator, size, args)
+            results.append(case)
+            print(f"{generator:>9} {case['stations']:>8} stations | "
+                  f"fastest p50 {case['fastest']['p50_ms']:8.2f} ms  p99 {case['fastest']['p99_ms']:8.2f} ms | "
+                  f"min transfers p50 {case['min_transfers']['p50_ms']:8.2f} ms | "
+                  f"collapse {case['collapse']['time_ms']:8.1f} ms")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# Compares two bench_routing.py JSON reports and flags regressions.
+# Cases are matched by (generator, size). Every time, memory and search-effort metric is
+# lower-is-better (except the process peak RSS, which is not per case and is skipped);
+# a metric regresses when new > old * (1 + threshold).
+#
+#   python benchmarks/compare.py old.json new.json [--threshold 0.10]
+
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ("_ms", "_s", "_kb", "_mb", "settled_mean", "pushes_mean", "relaxations_mean", "heap_max_mean")
+# Process-wide peaks that carry over from the cases run before, so not a property of the case itself
+NOT_COMPARED = ("max_rss_mb",)
+
+
+def flatten(case: dict, prefix: str = "") -> dict: #Flattens nested metric dicts into dotted keys, keeping numbers only.
+    flat = {}
+    for key, value in case.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {(case["generator"], case["size"]): flatten(case) for case in report["results"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two routing benchmark reports.")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    old, new = load(args.old), load(args.new)
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        print(f"== {key[0]} / {key[1]}")
+        for metric in sorted(old[key].keys() & new[key].keys()):
+            if not metric.endswith(LOWER_IS_BETTER) or metric in NOT_COMPARED:
+                continue
+            before, after = old[key][metric], new[key][metric]
+            ratio = after / before if before else float("inf") if after else 1.0
+            flag = ""
+            if ratio > 1 + args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"   {metric:<28} {before:12.3f} -> {after:12.3f}  x{ratio:6.2f}{flag}")
+
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"== {key[0]} / {key[1]}: only in {'old' if key in old else 'new'} report")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
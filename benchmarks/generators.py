@@ -0,0 +1,118 @@
+# Synthetic metro network generators for the benchmarks.
+# Every generator takes a target station count and a seed and returns a MetroNetwork.
+# Stations are spaced at least 1 coordinate unit apart and rides take 2-4 minutes, so the
+# Euclidean A* heuristic stays admissible. Interchanges are modelled like the sample data:
+# one station per line with the same name, joined by a short transfer connection.
+
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from YasinEkici_MetroSimulation import MetroNetwork
+
+
+def grid_network(n_stations: int, seed: int = 0) -> MetroNetwork:
+    #Manhattan-style grid: one horizontal line per row and one vertical line per column.
+    #Every crossing is an interchange, so the network has about n_stations / 2 crossings.
+    rng = random.Random(seed)
+    side = max(2, round(math.sqrt(n_stations / 2)))
+    metro = MetroNetwork()
+
+    for r in range(side):
+        for c in range(side):
+            name = f"G{r}_{c}"
+            metro.add_station(f"H{r}_{c}", name, f"Row {r}", x=2.0 * c, y=2.0 * r)
+            metro.add_station(f"V{r}_{c}", name, f"Col {c}", x=2.0 * c, y=2.0 * r)
+            metro.add_connection(f"H{r}_{c}", f"V{r}_{c}", rng.randint(2, 5))
+            if c > 0:
+                metro.add_connection(f"H{r}_{c - 1}", f"H{r}_{c}", rng.randint(2, 4))
+            if r > 0:
+                metro.add_connection(f"V{r - 1}_{c}", f"V{r}_{c}", rng.randint(2, 4))
+    return metro
+
+
+def radial_network(n_stations: int, seed: int = 0, spokes: int = 8, ring_every: int = 10) -> MetroNetwork:
+    #Spoke lines leaving a shared central hub, crossed by ring lines every ring_every stations.
+    rng = random.Random(seed)
+    metro = MetroNetwork()
+    rings = max(1, n_stations // (spokes * (ring_every + 1)))
+    spoke_length = rings * ring_every
+
+    for k in range(spokes):
+        angle = 2 * math.pi * k / spokes
+        for i in range(spoke_length + 1):
+            radius = 1.5 * i
+            name = "Center" if i == 0 else f"R{k}_{i}"
+            metro.add_station(f"S{k}_{i}", name, f"Spoke {k}", x=radius * math.cos(angle), y=radius * math.sin(angle))
+            if i > 0:
+                metro.add_connection(f"S{k}_{i - 1}", f"S{k}_{i}", rng.randint(2, 4))
+        if k > 0:
+            metro.add_connection(f"S{k - 1}_0", f"S{k}_0", rng.randint(2, 5))
+
+    for ring in range(1, rings + 1):
+        i = ring * ring_every
+        for k in range(spokes):
+            angle = 2 * math.pi * k / spokes
+            x, y = 1.5 * i * math.cos(angle), 1.5 * i * math.sin(angle)
+            metro.add_station(f"C{ring}_{k}", f"R{k}_{i}", f"Ring {ring}", x=x, y=y)
+            metro.add_connection(f"C{ring}_{k}", f"S{k}_{i}", rng.randint(2, 5))
+        # Ring rides are at least as long as the chord between neighbouring spokes
+        chord = 2 * 1.5 * i * math.sin(math.pi / spokes)
+        for k in range(spokes):
+            metro.add_connection(f"C{ring}_{k}", f"C{ring}_{(k + 1) % spokes}", math.ceil(chord) + rng.randint(0, 2))
+    return metro
+
+
+def multiline_network(n_stations: int, seed: int = 0, line_length: int = 40,
+                      interchange_ratio: float = 0.05) -> MetroNetwork:
+    #Lines laid out as random walks over a shared plane. Each line after the first starts at an
+    #interchange with a random station of an earlier line, so the network is connected. On top of that,
+    #about interchange_ratio of the stations get a walk link to a nearby station of another line.
+    rng = random.Random(seed)
+    metro = MetroNetwork()
+    n_lines = max(2, n_stations // line_length)
+    extent = 2.0 * math.sqrt(n_stations)
+    cells = {}  # coarse spatial hash: (cx, cy) -> station ids, used to find interchange partners
+
+    for l in range(n_lines):
+        if l == 0:
+            x, y = rng.uniform(0, extent), rng.uniform(0, extent)
+            origin = None
+        else:
+            origin = metro.stations[f"L{rng.randrange(l)}_{rng.randrange(line_length)}"]
+            x, y = origin.x, origin.y
+        heading = rng.uniform(0, 2 * math.pi)
+        for i in range(line_length):
+            idx = f"L{l}_{i}"
+            name = origin.name if i == 0 and origin is not None else f"N{l}_{i}"
+            metro.add_station(idx, name, f"Line {l}", x=x, y=y)
+            if i == 0 and origin is not None:
+                metro.add_connection(origin.idx, idx, rng.randint(2, 5))
+            cells.setdefault((int(x // 4), int(y // 4)), []).append(idx)
+            if i > 0:
+                metro.add_connection(f"L{l}_{i - 1}", idx, rng.randint(2, 4))
+            heading += rng.uniform(-0.5, 0.5)
+            x = min(max(x + 1.5 * math.cos(heading), 0.0), extent)
+            y = min(max(y + 1.5 * math.sin(heading), 0.0), extent)
+
+    stations = metro.stations
+    for idx in rng.sample(list(stations), int(len(stations) * interchange_ratio)):
+        st = stations[idx]
+        candidates = [other for other in cells[(int(st.x // 4), int(st.y // 4))]
+                      if stations[other].line != st.line]
+        if not candidates:
+            continue
+        other = stations[rng.choice(candidates)]
+        walk = math.hypot(st.x - other.x, st.y - other.y)
+        metro.add_connection(idx, other.idx, math.ceil(walk) + rng.randint(2, 5))
+    return metro
+
+
+GENERATORS = {
+    "grid": grid_network,
+    "radial": radial_network,
+    "multiline": multiline_network,
+}
@@ -0,0 +1,69 @@
+# Small random networks and brute-force path helpers shared by the tests.
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from YasinEkici_MetroSimulation import MetroNetwork
+
+SEEDS = range(40)
+
+
+def random_network(seed: int) -> MetroNetwork:
+    #5-8 stations on up to 3 lines with a few repeated names, so rides, transfers, walks and the odd
+    #parallel connection all occur. Coordinates are all 0 to keep the A* heuristic of find_fastest_route trivial.
+    rng = random.Random(seed)
+    n = rng.randint(5, 8)
+    names = [f"N{i}" for i in range(n - 2)]
+    metro = MetroNetwork()
+    for i in range(n):
+        metro.add_station(f"S{i}", rng.choice(names), f"L{rng.randint(0, 2)}")
+    for i in range(1, n):
+        metro.add_connection(f"S{i}", f"S{rng.randrange(i)}", rng.randint(1, 4))
+    for _ in range(n // 2):
+        a, b = rng.sample(range(n), 2)
+        metro.add_connection(f"S{a}", f"S{b}", rng.randint(1, 4))
+    return metro
+
+
+def adjacency(graph):
+    #Per-state rows of (target, travel_time, kind), rebuilt from the StateGraph arrays.
+    return [graph.edges(u) for u in range(len(graph))]
+
+
+def simple_paths(adjacency, start: int, goal: int):
+    #Yields every simple path start -> goal as a list of (state, edge id into adjacency rows).
+    path = [(start, None)]
+    on_path = {start}
+
+    def extend(u):
+        if u == goal:
+            yield list(path)
+            return
+        for j, (v, _, _) in enumerate(adjacency[u]):
+            if v not in on_path:
+                path.append((v, j))
+                on_path.add(v)
+                yield from extend(v)
+                on_path.discard(v)
+                path.pop()
+
+    yield from extend(start)
+
+
+def edge_cost(adjacency, penalties, u: int, v: int):
+    #Cheapest (search cost, travel time) of the connection u -> v, as parallel connections may exist.
+    return min((t + penalties[kind], t) for w, t, kind in adjacency[u] if w == v)
+
+
+def route_cost(adjacency, penalties, states):
+    costs = [edge_cost(adjacency, penalties, u, v) for u, v in zip(states, states[1:])]
+    return sum(c for c, _ in costs), sum(t for _, t in costs)
+
+
+def has_name_loop(name_ids, states) -> bool:
+    names = [name_ids[s] for s in states]
+    runs = [n for i, n in enumerate(names) if i == 0 or n != names[i - 1]]
+    return len(runs) != len(set(runs))
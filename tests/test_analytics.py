@@ -0,0 +1,205 @@
+# Brute-force checks of the route analytics on small random networks.
+# Every network has a handful of states, so all simple paths can be enumerated and compared
+# against k_shortest_routes, centrality and assign_demand. Run with: python -m pytest -q tests
+
+import itertools
+import math
+import random
+
+import pytest
+
+from networks import SEEDS, MetroNetwork, adjacency, has_name_loop, random_network, route_cost, simple_paths
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_k_shortest_routes_match_brute_force(seed):
+    metro = random_network(seed)
+    graph = metro.state_graph()
+    rows = adjacency(graph)
+    rng = random.Random(seed)
+    penalties = (0, rng.randint(0, 3), rng.randint(0, 3))
+    k = 4
+
+    for start_id, end_id in itertools.permutations(sorted(metro.stations), 2):
+        start, goal = metro.stations[start_id]._index, metro.stations[end_id]._index
+        # Paths as state sequences: parallel connections give the same route
+        paths = {tuple(s for s, _ in p) for p in simple_paths(rows, start, goal)}
+        costs = sorted(route_cost(rows, penalties, p)[0] for p in paths)
+        loop_free = sorted(route_cost(rows, penalties, p)[0] for p in paths
+                           if not has_name_loop(graph.name_ids, p))
+        expected = loop_free[:k]
+        # Yen gives up after 10 * k paths; skip pairs where the answer lies beyond that
+        if expected and sum(c <= expected[-1] for c in costs) >= 10 * k:
+            continue
+
+        routes = metro.k_shortest_routes(start_id, end_id, k=k, max_similarity=1.0,
+                                         transfer_penalty=penalties[1], walk_penalty=penalties[2])
+        got = []
+        for route, travel_time in routes:
+            states = [station._index for station in route]
+            assert states[0] == start and states[-1] == goal
+            assert len(set(states)) == len(states)
+            assert not has_name_loop(graph.name_ids, states)
+            cost, minutes = route_cost(rows, penalties, states)
+            assert travel_time == minutes
+            got.append(cost)
+        assert got == expected, (start_id, end_id)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_k_shortest_routes_first_route_is_fastest(seed):
+    metro = random_network(seed)
+    for start_id, end_id in itertools.permutations(sorted(metro.stations), 2):
+        fastest = metro.find_fastest_route(start_id, end_id, transfer_penalty=2)
+        routes = metro.k_shortest_routes(start_id, end_id, k=1, transfer_penalty=2)
+        graph = metro.state_graph()
+        rows = adjacency(graph)
+        if fastest is None:
+            assert routes == []
+        elif not has_name_loop(graph.name_ids, [s._index for s in fastest[0]]):
+            # k_shortest_routes drops routes that revisit a station name; otherwise the first
+            # route may differ from the fastest one on ties, never in cost
+            cost = lambda r: route_cost(rows, (0, 2, 0), [s._index for s in r])[0]
+            assert cost(routes[0][0]) == cost(fastest[0])
+
+
+def brute_force_centrality(rows, penalties):
+    #Betweenness per state and per connection (edge ids as in StateGraph.edge_list()) and mean plain
+    #travel time, from every shortest path of every ordered pair of states.
+    n = len(rows)
+    offsets = [0]
+    for row in rows:
+        offsets.append(offsets[-1] + len(row))
+    node_bc = [0.0] * n
+    edge_bc = [0.0] * offsets[n]
+    mean_time = [math.inf] * n
+    for s in range(n):
+        total = reached = 0
+        for t in range(n):
+            if s == t:
+                continue
+            paths = []
+            for path in simple_paths(rows, s, t):
+                edges = [(u, j) for (u, _), (_, j) in zip(path, path[1:])]
+                cost = sum(rows[u][j][1] + penalties[rows[u][j][2]] for u, j in edges)
+                minutes = sum(rows[u][j][1] for u, j in edges)
+                paths.append((cost, minutes, path, edges))
+            if not paths:
+                continue
+            best = min(cost for cost, _, _, _ in paths)
+            shortest = [p for p in paths if p[0] == best]
+            for _, _, path, edges in shortest:
+                for v, _ in path[1:-1]:
+                    node_bc[v] += 1 / len(shortest)
+                for u, j in edges:
+                    edge_bc[offsets[u] + j] += 1 / len(shortest)
+            total += min(minutes for _, minutes, _, _ in shortest)
+            reached += 1
+        if reached:
+            mean_time[s] = total / reached
+    return node_bc, edge_bc, mean_time
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_centrality_matches_brute_force(seed):
+    metro = random_network(seed)
+    rng = random.Random(seed)
+    penalties = (0, rng.randint(0, 3), rng.randint(0, 3))
+    node_bc, edge_bc, mean_time = brute_force_centrality(adjacency(metro.state_graph()), penalties)
+
+    result = metro.centrality(workers=1, transfer_penalty=penalties[1], walk_penalty=penalties[2])
+    assert list(result.station_betweenness) == pytest.approx(node_bc)
+    assert list(result.connection_betweenness) == pytest.approx(edge_bc)
+    # Plain minutes along the penalised shortest routes, not the penalised cost
+    assert list(result.mean_travel_time) == pytest.approx(mean_time)
+    assert list(result.closeness) == pytest.approx([1 / m if m else math.inf for m in mean_time])
+
+
+def test_centrality_unreachable_station():
+    metro = random_network(0)
+    metro.add_station("X", "Isolated", "L9")
+    result = metro.centrality(workers=1)
+    index = metro.stations["X"]._index
+    assert result.mean_travel_time[index] == math.inf
+    assert result.closeness[index] == 0.0
+    assert result.station_betweenness[index] == 0.0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_centrality_workers_agree(seed):
+    metro = random_network(seed)
+    serial = metro.centrality(workers=1, transfer_penalty=2)
+    parallel = metro.centrality(workers=2, transfer_penalty=2)
+    assert list(parallel.station_betweenness) == pytest.approx(list(serial.station_betweenness))
+    assert list(parallel.connection_betweenness) == pytest.approx(list(serial.connection_betweenness))
+    assert list(parallel.mean_travel_time) == list(serial.mean_travel_time)
+    assert list(parallel.closeness) == list(serial.closeness)
+
+
+def random_trips(metro: MetroNetwork, seed: int, count: int = 60):
+    rng = random.Random(seed)
+    ids = sorted(metro.stations)
+    return [(rng.choice(ids), rng.choice(ids), rng.randint(1, 9)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_assign_demand_matches_shortest_paths(seed):
+    metro = random_network(seed)
+    metro.add_station("X", "Isolated", "L9")
+    graph = metro.state_graph()
+    rng = random.Random(seed)
+    penalties = (0, rng.randint(0, 3), rng.randint(0, 3))
+    trips = random_trips(metro, seed) + [("X", "S0", 5), ("S0", "nowhere", 3)]
+
+    result = metro.assign_demand(trips, workers=1, transfer_penalty=penalties[1], walk_penalty=penalties[2])
+    edges = graph.edge_list()
+    rows = adjacency(graph)
+    kinds = [kind for row in rows for _, _, kind in row]
+    times = [t for row in rows for _, t, _ in row]
+
+    # Every passenger rides a shortest route: loaded cost equals demand times shortest cost
+    expected_cost = 0
+    expected_unassigned = 0
+    inflow = [0.0] * len(graph)
+    outflow = [0.0] * len(graph)
+    for origin_id, destination_id, passengers in trips:
+        if origin_id not in metro.stations or destination_id not in metro.stations:
+            expected_unassigned += passengers
+            continue
+        origin, destination = metro.stations[origin_id]._index, metro.stations[destination_id]._index
+        dist, _ = graph.shortest_path_tree(origin, penalties)
+        if dist[destination] == math.inf:
+            expected_unassigned += passengers
+            continue
+        expected_cost += passengers * dist[destination]
+        inflow[origin] += passengers
+        outflow[destination] += passengers
+    loaded_cost = sum(load * (t + penalties[kind]) for load, t, kind in zip(result.connection_loads, times, kinds))
+    assert loaded_cost == pytest.approx(expected_cost)
+    assert result.unassigned == expected_unassigned
+    assert result.passengers == sum(p for _, _, p in trips)
+
+    # Flow is conserved: what enters a state (boarding or arriving) leaves it (alighting or departing)
+    entering = list(inflow)
+    for (u, v), load in zip(edges, result.connection_loads):
+        entering[v] += load
+        outflow[u] += load
+    assert entering == pytest.approx(outflow)
+    assert list(result.station_volumes) == pytest.approx(entering)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_assign_demand_workers_and_inputs_agree(seed):
+    metro = random_network(seed)
+    trips = random_trips(metro, seed)
+    matrix = {}
+    for origin_id, destination_id, passengers in trips:
+        matrix[(origin_id, destination_id)] = matrix.get((origin_id, destination_id), 0) + passengers
+
+    serial = metro.assign_demand(trips, workers=1, transfer_penalty=2)
+    parallel = metro.assign_demand(trips, workers=2, transfer_penalty=2)
+    from_matrix = metro.assign_demand(matrix, workers=1, transfer_penalty=2)
+    for other in (parallel, from_matrix):
+        assert list(other.connection_loads) == list(serial.connection_loads)
+        assert list(other.station_volumes) == list(serial.station_volumes)
+        assert other.unassigned == serial.unassigned
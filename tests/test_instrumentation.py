@@ -0,0 +1,87 @@
+# Search instrumentation: SearchStats counters on a hand-checked network, search sinks and
+# SearchHistogram buckets. Run with: python -m pytest -q tests
+
+import pytest
+
+import networks  # noqa: F401  (puts the repository root on sys.path)
+from YasinEkici_MetroSimulation import MetroNetwork, SearchHistogram, SearchStats
+
+
+def triangle() -> MetroNetwork:
+    #A -1- B -1- C plus a direct A -5- C, all on one line at one point (the A* heuristic is 0).
+    #A* from A to C: settles A, B, C; pushes A, B, C (5) and C again (2); scans 2 edges at A and 2 at B,
+    #and holds both C entries at once.
+    metro = MetroNetwork()
+    for idx in "ABC":
+        metro.add_station(idx, idx, "L")
+    metro.add_connection("A", "B", 1)
+    metro.add_connection("A", "C", 5)
+    metro.add_connection("B", "C", 1)
+    return metro
+
+
+def test_fastest_route_counters():
+    stats = SearchStats()
+    route, travel_time = triangle().find_fastest_route("A", "C", stats=stats)
+    assert [s.idx for s in route] == ["A", "B", "C"] and travel_time == 2
+    assert (stats.algorithm, stats.start_id, stats.end_id, stats.found) == ("fastest", "A", "C", True)
+    assert (stats.settled, stats.pushes, stats.relaxations, stats.heap_max) == (3, 4, 4, 2)
+    assert stats.elapsed > 0
+
+
+def test_min_transfers_route_counters():
+    #0-1 BFS from A: every edge costs 0, so C is reached from A directly and B is still queued.
+    stats = SearchStats()
+    route = triangle().find_min_transfers_route("A", "C", stats=stats)
+    assert [s.idx for s in route] == ["A", "C"]
+    assert (stats.algorithm, stats.found) == ("min_transfers", True)
+    assert (stats.settled, stats.pushes, stats.relaxations, stats.heap_max) == (2, 3, 2, 2)
+
+
+@pytest.mark.parametrize("search", ["find_fastest_route", "find_min_transfers_route"])
+def test_sinks_receive_every_query(search):
+    metro = triangle()
+    received = []
+    metro.add_search_sink(received.append)
+    getattr(metro, search)("A", "C")
+    # Unknown stations still reach the sinks, as failed queries
+    getattr(metro, search)("A", "nowhere")
+    metro.remove_search_sink(received.append)
+    getattr(metro, search)("A", "B")
+
+    assert [(s.end_id, s.found) for s in received] == [("C", True), ("nowhere", False)]
+    assert (received[1].settled, received[1].pushes, received[1].relaxations) == (0, 0, 0)
+
+
+def test_unknown_station_fills_given_stats():
+    stats = SearchStats()
+    assert triangle().find_fastest_route("nowhere", "C", stats=stats) is None
+    assert (stats.algorithm, stats.start_id, stats.found) == ("fastest", "nowhere", False)
+
+
+def test_histogram_bucket_bounds():
+    histogram = SearchHistogram()
+    for settled in (0, 1, 2, 3, 4, 7, 8, 1000):
+        stats = SearchStats()
+        stats.algorithm = "fastest"
+        stats.settled = settled
+        histogram(stats)
+
+    assert histogram.queries["fastest"] == 8
+    # Bucket k holds 2**(k-1) <= v < 2**k, bucket 0 holds 0
+    assert histogram.histogram("fastest", "settled") == [
+        (0, 1, 1), (1, 2, 1), (2, 4, 2), (4, 8, 2), (8, 16, 1), (512, 1024, 1),
+    ]
+    for low, high, _ in histogram.histogram("fastest", "settled"):
+        assert low < high
+    assert histogram.histogram("min_transfers", "settled") == []
+
+
+def test_enable_search_histograms_aggregates_queries():
+    metro = triangle()
+    histogram = metro.enable_search_histograms()
+    assert metro.enable_search_histograms() is histogram
+    metro.find_fastest_route("A", "C")
+    metro.find_fastest_route("A", "B")
+    assert histogram.queries["fastest"] == 2
+    assert sum(count for _, _, count in histogram.histogram("fastest", "relaxations")) == 2
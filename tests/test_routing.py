@@ -0,0 +1,86 @@
+# Brute-force checks of the route searches on small random networks: penalties and transfer caps
+# of find_fastest_route / find_min_transfers_route against every simple path. Run with: python -m pytest -q tests
+
+import itertools
+import random
+
+import pytest
+
+from networks import SEEDS, adjacency, random_network, route_cost, simple_paths
+
+CAPS = (None, 0, 1, 2)
+
+
+def line_changes(graph, states) -> int:
+    return sum(graph.line_ids[u] != graph.line_ids[v] for u, v in zip(states, states[1:]))
+
+
+def check_route(rows, route, start: int, goal: int):
+    states = [station._index for station in route]
+    assert states[0] == start and states[-1] == goal
+    for u, v in zip(states, states[1:]):
+        assert any(w == v for w, _, _ in rows[u])
+    return states
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_fastest_route_penalties_and_cap_match_brute_force(seed):
+    metro = random_network(seed)
+    graph = metro.state_graph()
+    rows = adjacency(graph)
+    rng = random.Random(seed)
+    penalties = (0, rng.randint(0, 3), rng.randint(0, 3))
+
+    for start_id, end_id in itertools.permutations(sorted(metro.stations), 2):
+        start, goal = metro.stations[start_id]._index, metro.stations[end_id]._index
+        # With non-negative costs some simple path is always optimal, with or without a cap
+        paths = [[s for s, _ in p] for p in simple_paths(rows, start, goal)]
+        for cap in CAPS:
+            allowed = [p for p in paths if cap is None or line_changes(graph, p) <= cap]
+            result = metro.find_fastest_route(start_id, end_id, transfer_penalty=penalties[1],
+                                              walk_penalty=penalties[2], max_transfers=cap)
+            if not allowed:
+                assert result is None, (start_id, end_id, cap)
+                continue
+            route, travel_time = result
+            states = check_route(rows, route, start, goal)
+            assert cap is None or line_changes(graph, states) <= cap
+            cost, minutes = route_cost(rows, penalties, states)
+            assert cost == min(route_cost(rows, penalties, p)[0] for p in allowed)
+            assert travel_time == minutes
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_min_transfers_route_and_cap_match_brute_force(seed):
+    metro = random_network(seed)
+    graph = metro.state_graph()
+    rows = adjacency(graph)
+
+    for start_id, end_id in itertools.permutations(sorted(metro.stations), 2):
+        start, goal = metro.stations[start_id]._index, metro.stations[end_id]._index
+        fewest = min((line_changes(graph, [s for s, _ in p]) for p in simple_paths(rows, start, goal)),
+                     default=None)
+        for cap in CAPS:
+            route = metro.find_min_transfers_route(start_id, end_id, max_transfers=cap)
+            if fewest is None or (cap is not None and fewest > cap):
+                assert route is None, (start_id, end_id, cap)
+                continue
+            states = check_route(rows, route, start, goal)
+            assert line_changes(graph, states) == fewest
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"max_transfers": -1},
+    {"transfer_penalty": -1},
+    {"walk_penalty": -0.5},
+])
+def test_fastest_route_rejects_negative_arguments(kwargs):
+    metro = random_network(0)
+    with pytest.raises(ValueError):
+        metro.find_fastest_route("S0", "S1", **kwargs)
+
+
+def test_min_transfers_route_rejects_negative_cap():
+    metro = random_network(0)
+    with pytest.raises(ValueError):
+        metro.find_min_transfers_route("S0", "S1", max_transfers=-1)